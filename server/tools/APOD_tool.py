@@ -1,18 +1,95 @@
+import asyncio
 import datetime
 import os
 from typing import Any
+from urllib.parse import urlencode
 import httpx
+from _http import nasa_get, response_json
+from _dates import _validate_ymd, _is_settled
+from _cache import ttl_cache
 
 # Get NASA API key from environment variable (set by MCP client)
 NASA_API_KEY = os.getenv("NASA_API_KEY", "DEMO_KEY")
 MARS_API = "https://api.nasa.gov/mars-photos/api/v1/rovers/curiosity/photos?"
 APOD_API = "https://api.nasa.gov/planetary/apod?"
+_APOD_DEFAULT_URL = APOD_API + urlencode({"api_key": NASA_API_KEY})
 
-async def get_astronomy_picture_of_the_day_tool_defnition(date: Any = None, start_date: Any = None, end_date: Any = None, count: Any = None) -> str:
-    """Request to NASA Astronomy Picture of the Day API. Fetch astronomy pictures and their details."""
+# With parallel_fetch, date ranges longer than this many days are fetched as concurrent per-day requests
+_PARALLEL_MIN_DAYS = 3
+# ...up to this many days; longer ranges use a single request to spare the API quota
+_PARALLEL_MAX_DAYS = 7
+# DEMO_KEY allows 30 requests an hour, too few to spend several on one range query
+_PARALLEL_ALLOWED = NASA_API_KEY != "DEMO_KEY"
+
+@ttl_cache(maxsize=512, ttl=86400)
+async def _fetch_apod(api_url: str):
+    """Fetch an APOD URL and return the decoded JSON, cached for a day for dates that have settled."""
+    response = await nasa_get(api_url)
+    response.raise_for_status()
+    return response_json(response)
+
+# Today's picture and ranges reaching recent dates can still change, so cache them briefly
+_fetch_apod_recent = ttl_cache(maxsize=64, ttl=300)(_fetch_apod.__wrapped__)
+
+def _apod_fetcher(day: datetime.date):
+    """Pick the long or short cache for a query whose last date is `day`."""
+    return _fetch_apod if day is not None and _is_settled(day) else _fetch_apod_recent
+
+async def _fetch_apod_days(start_dt: datetime.date, end_dt: datetime.date) -> list:
+    """Fetch each day of a date range concurrently and return the pictures in date order."""
+    days = [start_dt + datetime.timedelta(days=offset) for offset in range((end_dt - start_dt).days + 1)]
+    urls = [APOD_API + urlencode({"date": day.isoformat(), "api_key": NASA_API_KEY}) for day in days]
+    # Any failed day fails the whole query, as the equivalent range request would
+    return list(await asyncio.gather(*(_apod_fetcher(day)(url) for day, url in zip(days, urls))))
+
+def _format_apod(data) -> str:
+    """Format an APOD API response (a single picture or a list of pictures)."""
+    # Handle both single image and multiple images response
+    if isinstance(data, list):
+        # Multiple images (from count or date range)
+        if len(data) == 0:
+            return "No APOD images found for the specified parameters"
+        
+        parts = [f"Found {len(data)} APOD images:\n\n"]
+        for i, apod in enumerate(data, 1):
+            parts.append(f"--- Image {i} ---\n")
+            parts.append(f"Date: {apod.get('date', 'Unknown')}\n")
+            parts.append(f"Title: {apod.get('title', 'No title')}\n")
+            
+            # Use hdurl if available, otherwise url
+            image_url = apod.get('hdurl') or apod.get('url', 'No image URL')
+            parts.append(f"Image URL: {image_url}\n")
+            
+            explanation = apod.get('explanation', 'No explanation available')
+            parts.append(f"Explanation: {explanation}\n\n")
+        
+        return "".join(parts).strip()
+    
+    else:
+        # Single image
+        result = "NASA Astronomy Picture of the Day\n"
+        result += f"Date: {data.get('date', 'Unknown')}\n"
+        result += f"Title: {data.get('title', 'No title')}\n"
+        
+        # Use hdurl if available, otherwise url
+        image_url = data.get('hdurl') or data.get('url', 'No image URL')
+        result += f"Image URL: {image_url}\n"
+        
+        explanation = data.get('explanation', 'No explanation available')
+        result += f"Explanation: {explanation}"
+        
+        return result
+
+async def get_astronomy_picture_of_the_day_tool_defnition(date: Any = None, start_date: Any = None, end_date: Any = None, count: Any = None, parallel_fetch: bool = False) -> str:
+    """Request to NASA Astronomy Picture of the Day API. Fetch astronomy pictures and their details.
+    
+    With parallel_fetch, a closed date range of up to a week is fetched as concurrent per-day requests.
+    This is ignored with DEMO_KEY, whose hourly quota one range query would use up.
+    """
     
     # Build parameters dictionary
     params = {}
+    start_dt = end_dt = date_dt = None
     
     # Validate mutually exclusive parameters
     if count is not None:
@@ -28,7 +105,7 @@ async def get_astronomy_picture_of_the_day_tool_defnition(date: Any = None, star
         # Validate start_date
         if start_date:
             try:
-                datetime.datetime.strptime(start_date, "%Y-%m-%d")
+                start_dt = _validate_ymd(start_date)
                 params["start_date"] = start_date
             except ValueError:
                 return "Error: start_date must be in YYYY-MM-DD format"
@@ -36,75 +113,32 @@ async def get_astronomy_picture_of_the_day_tool_defnition(date: Any = None, star
         # Validate end_date
         if end_date:
             try:
-                datetime.datetime.strptime(end_date, "%Y-%m-%d")
+                end_dt = _validate_ymd(end_date)
                 params["end_date"] = end_date
             except ValueError:
                 return "Error: end_date must be in YYYY-MM-DD format"
     elif date:
         # Validate single date
         try:
-            print(date)
-            print(type(date))
-            datetime.datetime.strptime(date, "%Y-%m-%d")
+            date_dt = _validate_ymd(date)
             params["date"] = date
         except ValueError:
             return "Error: date must be in YYYY-MM-DD format"
     
-    # Build URL parameters string
-    param_url = ""
-    for param_key, param_value in params.items():
-        param_url += f"{param_key}={param_value}&"
-    
-    # Add API key
-    param_url += f"api_key={NASA_API_KEY}"
-    
-    # Complete URL
-    api_url = APOD_API + param_url
+    # Complete URL, using the prebuilt one when there are no parameters
+    if not params:
+        api_url = _APOD_DEFAULT_URL
+    else:
+        api_url = APOD_API + urlencode({**params, "api_key": NASA_API_KEY})
     
     try:
-        # Make API request
-        async with httpx.AsyncClient() as client:
-            response = await client.get(api_url, timeout=30.0)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Handle both single image and multiple images response
-            if isinstance(data, list):
-                # Multiple images (from count or date range)
-                if len(data) == 0:
-                    return "No APOD images found for the specified parameters"
-                
-                result = f"Found {len(data)} APOD images:\n\n"
-                for i, apod in enumerate(data, 1):
-                    result += f"--- Image {i} ---\n"
-                    result += f"Date: {apod.get('date', 'Unknown')}\n"
-                    result += f"Title: {apod.get('title', 'No title')}\n"
-                    
-                    # Use hdurl if available, otherwise url
-                    image_url = apod.get('hdurl') or apod.get('url', 'No image URL')
-                    result += f"Image URL: {image_url}\n"
-                    
-                    explanation = apod.get('explanation', 'No explanation available')
-                    result += f"Explanation: {explanation}\n\n"
-                
-                return result.strip()
-            
-            else:
-                # Single image
-                result = "NASA Astronomy Picture of the Day\n"
-                result += f"Date: {data.get('date', 'Unknown')}\n"
-                result += f"Title: {data.get('title', 'No title')}\n"
-                
-                # Use hdurl if available, otherwise url
-                image_url = data.get('hdurl') or data.get('url', 'No image URL')
-                result += f"Image URL: {image_url}\n"
-                
-                explanation = data.get('explanation', 'No explanation available')
-                result += f"Explanation: {explanation}"
-                
-                return result
-            
+        if parallel_fetch and _PARALLEL_ALLOWED and start_dt and end_dt and _PARALLEL_MIN_DAYS < (end_dt - start_dt).days <= _PARALLEL_MAX_DAYS:
+            return _format_apod(await _fetch_apod_days(start_dt, end_dt))
+        # Random picks are never cached; everything else is cached by how recent its last date is
+        if count is not None:
+            return _format_apod(await _fetch_apod.__wrapped__(api_url))
+        return _format_apod(await _apod_fetcher(date_dt or end_dt)(api_url))
+        
     except httpx.TimeoutException:
         return "Error: Request timed out. Please try again."
     except httpx.HTTPStatusError as e:
@@ -1,7 +1,72 @@
-import datetime
 import os
+import re
 from typing import Any
+from urllib.parse import urlencode
 import httpx
+from _http import get_with_retry, _GIBS_SEM
+from _dates import _validate_ymd
+from _cache import ttl_cache
+
+# Supported output formats and projections
+_VALID_FORMATS = frozenset({"image/png", "image/jpeg"})
+_VALID_PROJECTIONS = frozenset({"epsg4326", "epsg3857"})
+_VALID_FORMATS_TEXT = "image/png, image/jpeg"
+_VALID_PROJECTIONS_TEXT = "epsg4326, epsg3857"
+
+# Four comma-separated decimal numbers: min_lon,min_lat,max_lon,max_lat
+_NUMBER = r"\s*(-?\d+(?:\.\d+)?)\s*"
+_BBOX_RE = re.compile(f"{_NUMBER},{_NUMBER},{_NUMBER},{_NUMBER}")
+
+@ttl_cache(maxsize=512, ttl=3600)
+async def _fetch_gibs(final_url: str, layer: str, bbox: str, date, width: int, height: int, format: str, projection_upper: str, area_width: float, area_height: float) -> str:
+    """Fetch a GIBS WMS URL and format the response. Successful results are cached by request."""
+    # Stream the response so only the headers are read; the image body is never downloaded
+    response = await get_with_retry(
+        final_url,
+        sem=_GIBS_SEM,
+        stream=True,
+        headers={
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+    )
+    try:
+        response.raise_for_status()
+        
+        # Check if response is an image
+        content_type = response.headers.get('content-type', '')
+        if not content_type.startswith('image/'):
+            # If not an image, it might be an error response. Only read a bounded
+            # prefix of the body, and raise rather than return so errors are never cached
+            error_head = b''
+            async for chunk in response.aiter_bytes():
+                error_head += chunk
+                if len(error_head) >= 4096:
+                    break
+            error_head = error_head[:4096]
+            if b'ServiceException' in error_head or b'Error' in error_head:
+                raise ValueError("GIBS service returned an error. Please check your parameters.")
+            raise ValueError(f"Unexpected response type: {content_type}")
+        
+        content_length = response.headers.get('content-length')
+    finally:
+        await response.aclose()
+    
+    # Build result
+    result = f"GIBS Satellite Image Retrieved!\n"
+    result += f"Image URL: {final_url}\n"
+    result += f"Layer: {layer}\n"
+    result += f"Date: {date if date else 'Most recent available'}\n"
+    result += f"Bounding Box: {bbox}\n"
+    result += f"Coverage Area: {area_width:.2f}° longitude × {area_height:.2f}° latitude\n"
+    result += f"Image Size: {width}×{height} pixels\n"
+    result += f"Format: {format}\n"
+    result += f"Projection: {projection_upper}\n"
+    result += f"Image Size: {content_length + ' bytes' if content_length else 'Unknown'}"
+    
+    return result
+
+# "Most recent available" imagery can change, so it is only reused briefly for rapid repeat queries
+_fetch_gibs_recent = ttl_cache(maxsize=128, ttl=60)(_fetch_gibs.__wrapped__)
 
 async def get_gibs_image_definition(
     layer: str = "MODIS_Terra_CorrectedReflectance_TrueColor",
@@ -35,13 +100,12 @@ async def get_gibs_image_definition(
     """
     
     # Validate parameters
-    valid_formats = ["image/png", "image/jpeg"]
-    if format not in valid_formats:
-        return f"Error: Invalid format '{format}'. Valid options: {', '.join(valid_formats)}"
+    if format not in _VALID_FORMATS:
+        return f"Error: Invalid format '{format}'. Valid options: {_VALID_FORMATS_TEXT}"
     
-    valid_projections = ["epsg4326", "epsg3857"]
-    if projection.lower() not in valid_projections:
-        return f"Error: Invalid projection '{projection}'. Valid options: {', '.join(valid_projections)}"
+    projection_lower = projection.lower()
+    if projection_lower not in _VALID_PROJECTIONS:
+        return f"Error: Invalid projection '{projection}'. Valid options: {_VALID_PROJECTIONS_TEXT}"
     
     # Validate dimensions
     if width < 1 or width > 2048:
@@ -50,31 +114,28 @@ async def get_gibs_image_definition(
         return "Error: height must be between 1 and 2048 pixels"
     
     # Validate bounding box format
-    try:
-        bbox_parts = bbox.split(",")
-        if len(bbox_parts) != 4:
-            return "Error: bbox must be in format 'min_lon,min_lat,max_lon,max_lat'"
-        
-        min_lon, min_lat, max_lon, max_lat = map(float, bbox_parts)
-        
-        # Basic validation
-        if min_lon >= max_lon or min_lat >= max_lat:
-            return "Error: Invalid bounding box coordinates"
-        if min_lon < -180 or max_lon > 180 or min_lat < -90 or max_lat > 90:
-            return "Error: Coordinates must be within valid ranges (lon: -180 to 180, lat: -90 to 90)"
-            
-    except ValueError:
+    if bbox.count(",") != 3:
+        return "Error: bbox must be in format 'min_lon,min_lat,max_lon,max_lat'"
+    
+    bbox_match = _BBOX_RE.fullmatch(bbox)
+    if not bbox_match:
         return "Error: bbox coordinates must be valid numbers"
+    min_lon, min_lat, max_lon, max_lat = map(float, bbox_match.groups())
+    
+    # Basic validation
+    if min_lon >= max_lon or min_lat >= max_lat:
+        return "Error: Invalid bounding box coordinates"
+    if min_lon < -180 or max_lon > 180 or min_lat < -90 or max_lat > 90:
+        return "Error: Coordinates must be within valid ranges (lon: -180 to 180, lat: -90 to 90)"
     
     # Validate date format if provided
     if date:
         try:
-            datetime.datetime.strptime(date, "%Y-%m-%d")
+            _validate_ymd(date)
         except ValueError:
             return "Error: date must be in YYYY-MM-DD format"
     
     # Build API URL
-    projection_lower = projection.lower()
     base_url = f"https://gibs.earthdata.nasa.gov/wms/{projection_lower}/best/wms.cgi"
     
     # Build parameters
@@ -95,47 +156,18 @@ async def get_gibs_image_definition(
         params["TIME"] = date
     
     # Build query string
-    query_string = "&".join([f"{key}={value}" for key, value in params.items()])
+    query_string = urlencode(params, safe=",:/")
     final_url = f"{base_url}?{query_string}"
     
+    # Calculate approximate area covered
+    area_width = abs(max_lon - min_lon)
+    area_height = abs(max_lat - min_lat)
+    
     try:
-        # Make API request to check if the image is available
-        async with httpx.AsyncClient(
-            follow_redirects=True,
-            timeout=30.0,
-            headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-        ) as client:
-            response = await client.get(final_url, timeout=30.0)
-            response.raise_for_status()
-            
-            # Check if response is an image
-            content_type = response.headers.get('content-type', '')
-            if not content_type.startswith('image/'):
-                # If not an image, it might be an error response
-                error_text = response.text
-                if 'ServiceException' in error_text or 'Error' in error_text:
-                    return f"Error: GIBS service returned an error. Please check your parameters."
-                return f"Error: Unexpected response type: {content_type}"
-            
-            # Calculate approximate area covered
-            area_width = abs(max_lon - min_lon)
-            area_height = abs(max_lat - min_lat)
-            
-            # Build result
-            result = f"GIBS Satellite Image Retrieved!\n"
-            result += f"Image URL: {final_url}\n"
-            result += f"Layer: {layer}\n"
-            result += f"Date: {date if date else 'Most recent available'}\n"
-            result += f"Bounding Box: {bbox}\n"
-            result += f"Coverage Area: {area_width:.2f}° longitude × {area_height:.2f}° latitude\n"
-            result += f"Image Size: {width}×{height} pixels\n"
-            result += f"Format: {format}\n"
-            result += f"Projection: {projection.upper()}\n"
-            result += f"Image Size: {len(response.content)} bytes"
-            
-            return result
+        fetch_args = (final_url, layer, bbox, date, width, height, format, projection_lower.upper(), area_width, area_height)
+        if date:
+            return await _fetch_gibs(*fetch_args)
+        return await _fetch_gibs_recent(*fetch_args)
             
     except httpx.TimeoutException:
         return "Error: Request timed out. Please try again."
@@ -150,60 +182,67 @@ async def get_gibs_image_definition(
         return f"Error: {str(e)}"
 
 
-async def get_gibs_layers_definition() -> str:
-    """Get information about available GIBS layers and their capabilities."""
-    
-    layers_info = {
-        "True Color Imagery": [
-            "MODIS_Terra_CorrectedReflectance_TrueColor",
-            "MODIS_Aqua_CorrectedReflectance_TrueColor", 
-            "VIIRS_SNPP_CorrectedReflectance_TrueColor",
-            "VIIRS_NOAA20_CorrectedReflectance_TrueColor"
-        ],
-        "False Color Imagery": [
-            "MODIS_Terra_CorrectedReflectance_Bands721",
-            "MODIS_Aqua_CorrectedReflectance_Bands721",
-            "VIIRS_SNPP_CorrectedReflectance_Bands_M11-I2-I1",
-            "VIIRS_NOAA20_CorrectedReflectance_Bands_M11-I2-I1"
-        ],
-        "Environmental Data": [
-            "MODIS_Terra_Aerosol",
-            "MODIS_Aqua_Aerosol",
-            "MODIS_Terra_Land_Surface_Temp_Day",
-            "MODIS_Terra_Land_Surface_Temp_Night",
-            "MODIS_Terra_Sea_Ice",
-            "MODIS_Terra_Snow_Cover"
-        ],
-        "Reference Data": [
-            "Reference_Labels_15m",
-            "Reference_Features_15m",
-            "Coastlines_15m",
-            "SRTM_GL1_Hillshade"
-        ]
-    }
-    
-    result = "Available GIBS Layers:\n\n"
+# GIBS layer catalog, grouped by category
+GIBS_LAYERS = {
+    "True Color Imagery": [
+        "MODIS_Terra_CorrectedReflectance_TrueColor",
+        "MODIS_Aqua_CorrectedReflectance_TrueColor", 
+        "VIIRS_SNPP_CorrectedReflectance_TrueColor",
+        "VIIRS_NOAA20_CorrectedReflectance_TrueColor"
+    ],
+    "False Color Imagery": [
+        "MODIS_Terra_CorrectedReflectance_Bands721",
+        "MODIS_Aqua_CorrectedReflectance_Bands721",
+        "VIIRS_SNPP_CorrectedReflectance_Bands_M11-I2-I1",
+        "VIIRS_NOAA20_CorrectedReflectance_Bands_M11-I2-I1"
+    ],
+    "Environmental Data": [
+        "MODIS_Terra_Aerosol",
+        "MODIS_Aqua_Aerosol",
+        "MODIS_Terra_Land_Surface_Temp_Day",
+        "MODIS_Terra_Land_Surface_Temp_Night",
+        "MODIS_Terra_Sea_Ice",
+        "MODIS_Terra_Snow_Cover"
+    ],
+    "Reference Data": [
+        "Reference_Labels_15m",
+        "Reference_Features_15m",
+        "Coastlines_15m",
+        "SRTM_GL1_Hillshade"
+    ]
+}
+
+def _render_gibs_layers(layers_info: dict) -> str:
+    """Render the GIBS layer catalog and usage tips as a readable string."""
+    parts = ["Available GIBS Layers:\n\n"]
     
     for category, layers in layers_info.items():
-        result += f"{category}:\n"
+        parts.append(f"{category}:\n")
         for layer in layers:
-            result += f"  - {layer}\n"
-        result += "\n"
-    
-    result += "Popular Bounding Boxes:\n"
-    result += "  - World: -180,-90,180,90\n"
-    result += "  - North America: -170,15,-50,75\n"
-    result += "  - Europe: -25,35,45,70\n"
-    result += "  - Asia: 60,-10,150,55\n"
-    result += "  - Australia: 110,-45,160,-10\n"
-    result += "  - Africa: -25,-40,55,40\n"
-    result += "  - South America: -85,-60,-30,15\n\n"
-    
-    result += "Usage Tips:\n"
-    result += "- Use epsg4326 for geographic data, epsg3857 for web mapping\n"
-    result += "- PNG format preserves transparency, JPEG is smaller file size\n"
-    result += "- Date format: YYYY-MM-DD (not all layers support all dates)\n"
-    result += "- Smaller bounding boxes provide higher detail\n"
-    result += "- Maximum recommended image size: 2048x2048 pixels"
-    
-    return result
\ No newline at end of file
+            parts.append(f"  - {layer}\n")
+        parts.append("\n")
+    
+    parts.append("Popular Bounding Boxes:\n")
+    parts.append("  - World: -180,-90,180,90\n")
+    parts.append("  - North America: -170,15,-50,75\n")
+    parts.append("  - Europe: -25,35,45,70\n")
+    parts.append("  - Asia: 60,-10,150,55\n")
+    parts.append("  - Australia: 110,-45,160,-10\n")
+    parts.append("  - Africa: -25,-40,55,40\n")
+    parts.append("  - South America: -85,-60,-30,15\n\n")
+    
+    parts.append("Usage Tips:\n")
+    parts.append("- Use epsg4326 for geographic data, epsg3857 for web mapping\n")
+    parts.append("- PNG format preserves transparency, JPEG is smaller file size\n")
+    parts.append("- Date format: YYYY-MM-DD (not all layers support all dates)\n")
+    parts.append("- Smaller bounding boxes provide higher detail\n")
+    parts.append("- Maximum recommended image size: 2048x2048 pixels")
+    
+    return "".join(parts)
+
+# The catalog is static, so the response is rendered once at import
+_GIBS_LAYERS_RESPONSE = _render_gibs_layers(GIBS_LAYERS)
+
+async def get_gibs_layers_definition() -> str:
+    """Get information about available GIBS layers and their capabilities."""
+    return _GIBS_LAYERS_RESPONSE
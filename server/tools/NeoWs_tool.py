@@ -1,11 +1,38 @@
 import datetime
 import os
 from typing import Any
+from urllib.parse import urlencode
 import httpx
+from _http import nasa_get, response_json
+from _dates import _validate_ymd, _is_settled
+from _cache import ttl_cache
 
 # Constants
 NEOWS_API = "https://api.nasa.gov/neo/rest/v1/feed?"
 NASA_API_KEY = os.getenv("NASA_API_KEY", "DEMO_KEY")
+_NEOWS_DEFAULT_URL = NEOWS_API + urlencode({"api_key": NASA_API_KEY})
+
+class _NeoWsAPIError(Exception):
+    """Error message reported in a NeoWs response body"""
+
+@ttl_cache(maxsize=256, ttl=86400)
+async def _fetch_neo_feed(api_url: str):
+    """Fetch and decode a NeoWs feed, cached for a day for date ranges that have settled"""
+    response = await nasa_get(api_url)
+    
+    # Parse JSON response first to check for API error format
+    data = response_json(response)
+    
+    # Check if the response contains an API error (even with HTTP 200)
+    if "error_message" in data:
+        raise _NeoWsAPIError(data.get('error_message', 'Unknown error occurred'))
+    
+    # Check for HTTP errors after parsing JSON
+    response.raise_for_status()
+    return data
+
+# The default feed and ranges reaching recent or future dates are still being updated, so cache them briefly
+_fetch_neo_feed_default = ttl_cache(maxsize=64, ttl=300)(_fetch_neo_feed.__wrapped__)
 
 async def get_neo_feed_definition(start_date: Any = None, end_date: Any = None, limit_per_day: int = 2) -> str:
     """Gets Near Earth Objects (NEO) data from NASA's NeoWs API.
@@ -20,6 +47,7 @@ async def get_neo_feed_definition(start_date: Any = None, end_date: Any = None,
     """
     
     params = {}
+    range_end = None
     
     # Validate limit_per_day parameter
     if limit_per_day <= 0:
@@ -30,13 +58,15 @@ async def get_neo_feed_definition(start_date: Any = None, end_date: Any = None,
         # Validate start_date
         if start_date:
             try:
-                start_dt = datetime.datetime.strptime(start_date, "%Y-%m-%d")
+                start_dt = _validate_ymd(start_date)
                 params["start_date"] = start_date
             except ValueError:
                 return "Error: start_date must be in YYYY-MM-DD format"
+            # Without end_date the feed covers the 7 days from start_date
+            range_end = start_dt + datetime.timedelta(days=7)
             if end_date:
                 try:
-                    end_dt = datetime.datetime.strptime(end_date, "%Y-%m-%d")
+                    end_dt = _validate_ymd(end_date)
                     params["end_date"] = end_date
                 except ValueError:
                     return "Error: end_date must be in YYYY-MM-DD format"
@@ -44,133 +74,117 @@ async def get_neo_feed_definition(start_date: Any = None, end_date: Any = None,
                     return "Error: Date range cannot exceed 7 days"
                 elif end_dt < start_dt:
                     return "Error: end_date must be after start_date"
+                range_end = end_dt
         else:
             return "Error: start_date must provided to use the end_date"
     
-    # Build URL parameters string
-    param_url = ""
-    for param_key, param_value in params.items():
-        param_url += f"{param_key}={param_value}&"
-    
-    # Add API key
-    param_url += f"api_key={NASA_API_KEY}"
-    
-    # Complete URL
-    api_url = NEOWS_API + param_url
+    # Complete URL, using the prebuilt one when there are no parameters
+    if not params:
+        api_url = _NEOWS_DEFAULT_URL
+    else:
+        api_url = NEOWS_API + urlencode({**params, "api_key": NASA_API_KEY})
     
     try:
-        # Make API request
-        async with httpx.AsyncClient() as client:
-            response = await client.get(api_url, timeout=30.0)
-            
-            # Parse JSON response first to check for API error format
-            data = response.json()
-            
-            # Check if the response contains an API error (even with HTTP 200)
-            if "error_message" in data:
-                return f"API Error: {data.get('error_message', 'Unknown error occurred')}"
-            
-            # Check for HTTP errors after parsing JSON
-            response.raise_for_status()
-            
-            # Extract key information
-            element_count = data.get('element_count', 0)
-            near_earth_objects = data.get('near_earth_objects', {})
-            
-            if element_count == 0:
-                return "No Near Earth Objects found for the specified date range"
+        # Make API request. The feed returns the whole range (up to 7 days) in one response,
+        # so it is fetched as a single request rather than fanned out per day
+        if range_end is not None and _is_settled(range_end):
+            data = await _fetch_neo_feed(api_url)
+        else:
+            data = await _fetch_neo_feed_default(api_url)
+        
+        # Extract key information
+        element_count = data.get('element_count', 0)
+        near_earth_objects = data.get('near_earth_objects', {})
+        
+        if element_count == 0:
+            return "No Near Earth Objects found for the specified date range"
+        
+        parts = [f"NASA Near Earth Objects (NEO) Feed\n"]
+        parts.append(f"Total asteroids found: {element_count}\n")
+        parts.append(f"Showing up to {limit_per_day} asteroids per day\n")
+        
+        # Add date range info
+        if params:
+            date_range = f"Date range: {params.get('start_date', 'auto')} to {params.get('end_date', 'auto')}"
+        else:
+            date_range = "Date range: Next 7 days (default)"
+        parts.append(f"{date_range}\n\n")
+        
+        # Process each date's asteroids (limited per day)
+        total_shown = 0
+        hazardous_count = 0
+        dict_get = dict.get
+        append = parts.append
+        for date_str, asteroids in near_earth_objects.items():
+            # Count hazardous asteroids across all of the day's asteroids, not only the shown ones
+            hazardous_count += sum(bool(dict_get(ast, 'is_potentially_hazardous_asteroid')) for ast in asteroids)
             
-            result = f"NASA Near Earth Objects (NEO) Feed\n"
-            result += f"Total asteroids found: {element_count}\n"
-            result += f"Showing up to {limit_per_day} asteroids per day\n"
+            # Limit asteroids per day
+            limited_asteroids = asteroids[:limit_per_day]
+            total_shown += len(limited_asteroids)
             
-            # Add date range info
-            if params:
-                date_range = f"Date range: {params.get('start_date', 'auto')} to {params.get('end_date', 'auto')}"
-            else:
-                date_range = "Date range: Next 7 days (default)"
-            result += f"{date_range}\n\n"
+            append(f"=== {date_str} ({len(asteroids)} asteroids total, showing {len(limited_asteroids)}) ===\n")
             
-            # Process each date's asteroids (limited per day)
-            total_shown = 0
-            for date_str, asteroids in near_earth_objects.items():
-                # Limit asteroids per day
-                limited_asteroids = asteroids[:limit_per_day]
-                total_shown += len(limited_asteroids)
+            for i, asteroid in enumerate(limited_asteroids, 1):
+                g = asteroid.get
+                append(
+                    f"\n--- Asteroid {i} ---\n"
+                    f"Name: {g('name', 'Unknown')}\n"
+                    f"ID: {g('id', 'Unknown')}\n"
+                    f"Absolute Magnitude: {g('absolute_magnitude_h', 'Unknown')}\n"
+                )
                 
-                result += f"=== {date_str} ({len(asteroids)} asteroids total, showing {len(limited_asteroids)}) ===\n"
+                # Diameter estimates
+                km_diameter = g('estimated_diameter', {}).get('kilometers', {})
+                if km_diameter:
+                    min_km = km_diameter.get('estimated_diameter_min', 0)
+                    max_km = km_diameter.get('estimated_diameter_max', 0)
+                    append(f"Estimated Diameter: {min_km:.3f} - {max_km:.3f} km\n")
                 
-                for i, asteroid in enumerate(limited_asteroids, 1):
-                    result += f"\n--- Asteroid {i} ---\n"
-                    result += f"Name: {asteroid.get('name', 'Unknown')}\n"
-                    result += f"ID: {asteroid.get('id', 'Unknown')}\n"
-                    result += f"Absolute Magnitude: {asteroid.get('absolute_magnitude_h', 'Unknown')}\n"
-                    
-                    # Diameter estimates
-                    diameter = asteroid.get('estimated_diameter', {})
-                    km_diameter = diameter.get('kilometers', {})
-                    if km_diameter:
-                        min_km = km_diameter.get('estimated_diameter_min', 0)
-                        max_km = km_diameter.get('estimated_diameter_max', 0)
-                        result += f"Estimated Diameter: {min_km:.3f} - {max_km:.3f} km\n"
+                # Hazard status
+                append("Potentially Hazardous: Yes\n" if g('is_potentially_hazardous_asteroid', False) else "Potentially Hazardous: No\n")
+                
+                # Close approach data
+                close_approach = g('close_approach_data', [])
+                if close_approach:
+                    approach_get = close_approach[0].get  # Get the first (closest) approach
+                    append(f"Close Approach Date: {approach_get('close_approach_date_full', 'Unknown')}\n")
                     
-                    # Hazard status
-                    is_hazardous = asteroid.get('is_potentially_hazardous_asteroid', False)
-                    result += f"Potentially Hazardous: {'Yes' if is_hazardous else 'No'}\n"
+                    # Velocity
+                    velocity = approach_get('relative_velocity', {})
+                    if velocity:
+                        append(f"Relative Velocity: {velocity.get('kilometers_per_hour', 'Unknown')} km/h\n")
                     
-                    # Close approach data
-                    close_approach = asteroid.get('close_approach_data', [])
-                    if close_approach:
-                        approach = close_approach[0]  # Get the first (closest) approach
-                        result += f"Close Approach Date: {approach.get('close_approach_date_full', 'Unknown')}\n"
-                        
-                        # Velocity
-                        velocity = approach.get('relative_velocity', {})
-                        if velocity:
-                            km_per_hour = velocity.get('kilometers_per_hour', 'Unknown')
-                            result += f"Relative Velocity: {km_per_hour} km/h\n"
-                        
-                        # Miss distance
-                        miss_distance = approach.get('miss_distance', {})
-                        if miss_distance:
-                            km_distance = miss_distance.get('kilometers', 'Unknown')
-                            lunar_distance = miss_distance.get('lunar', 'Unknown')
-                            result += f"Miss Distance: {km_distance} km ({lunar_distance} lunar distances)\n"
-                        
-                        result += f"Orbiting Body: {approach.get('orbiting_body', 'Unknown')}\n"
+                    # Miss distance
+                    miss_distance = approach_get('miss_distance', {})
+                    if miss_distance:
+                        miss_get = miss_distance.get
+                        append(f"Miss Distance: {miss_get('kilometers', 'Unknown')} km ({miss_get('lunar', 'Unknown')} lunar distances)\n")
                     
-                    # NASA JPL URL for more details
-                    jpl_url = asteroid.get('nasa_jpl_url', '')
-                    if jpl_url:
-                        result += f"More Details: {jpl_url}\n"
+                    append(f"Orbiting Body: {approach_get('orbiting_body', 'Unknown')}\n")
                 
-                result += "\n"
-            
-            # Add summary statistics
-            hazardous_count = 0
-            for asteroids in near_earth_objects.values():
-                hazardous_count += sum(1 for ast in asteroids if ast.get('is_potentially_hazardous_asteroid', False))
-            
-            result += f"Summary:\n"
-            result += f"Total asteroids in feed: {element_count}\n"
-            result += f"Asteroids shown: {total_shown}\n"
-            result += f"Potentially hazardous asteroids (total): {hazardous_count}\n"
-            result += f"Non-hazardous asteroids (total): {element_count - hazardous_count}\n"
-            
-            return result.strip()
+                # NASA JPL URL for more details
+                jpl_url = g('nasa_jpl_url', '')
+                if jpl_url:
+                    append(f"More Details: {jpl_url}\n")
             
+            append("\n")
+        
+        # Add summary statistics
+        parts.append(f"Summary:\n")
+        parts.append(f"Total asteroids in feed: {element_count}\n")
+        parts.append(f"Asteroids shown: {total_shown}\n")
+        parts.append(f"Potentially hazardous asteroids (total): {hazardous_count}\n")
+        parts.append(f"Non-hazardous asteroids (total): {element_count - hazardous_count}\n")
+        
+        return "".join(parts).strip()
+        
+    except _NeoWsAPIError as e:
+        return f"API Error: {str(e)}"
     except httpx.TimeoutException:
         return "Error: Request timed out. Please try again."
     except httpx.HTTPStatusError as e:
-        try:
-            # Try to parse JSON response for detailed error message
-            error_data = e.response.json()
-            if "error_message" in error_data:
-                return f"API Error: {error_data.get('error_message', 'Unknown error occurred')}"
-        except:
-            # If JSON parsing fails, use generic HTTP error messages
-            pass
-        
+        # The body was already checked for an API error message before raising
         if e.response.status_code == 400:
             return "Error: Invalid date format or date range exceeds 7 days"
         elif e.response.status_code == 403:
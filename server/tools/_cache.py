@@ -0,0 +1,46 @@
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+
+def ttl_cache(maxsize: int = 512, ttl: float = 3600.0):
+    """Cache the results of an async function by its arguments for `ttl` seconds.
+
+    Entries are evicted least-recently-used once `maxsize` is reached. Calls that
+    raise are not cached. Concurrent calls with the same arguments share a single
+    in-flight call instead of each starting their own. The undecorated coroutine
+    is available as `__wrapped__` for callers that need to bypass the cache.
+    """
+    def decorator(func):
+        cache = OrderedDict()
+        inflight = {}
+
+        async def load(args):
+            try:
+                value = await func(*args)
+                cache[args] = (time.monotonic() + ttl, value)
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
+                return value
+            finally:
+                del inflight[args]
+
+        @functools.wraps(func)
+        async def wrapper(*args):
+            entry = cache.get(args)
+            if entry is not None:
+                expires_at, value = entry
+                if time.monotonic() < expires_at:
+                    cache.move_to_end(args)
+                    return value
+                del cache[args]
+
+            task = inflight.get(args)
+            if task is None:
+                task = inflight[args] = asyncio.ensure_future(load(args))
+            # Shield the shared call so one caller being cancelled does not cancel it for the others
+            return await asyncio.shield(task)
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+    return decorator
@@ -0,0 +1,21 @@
+import datetime
+import functools
+import re
+
+_YMD_RE = re.compile(r"([0-9]{4})-([0-9]{2})-([0-9]{2})")
+
+# Upstream data for dates at least this old is fully published and no longer revised
+_SETTLED_AGE = datetime.timedelta(days=2)
+
+@functools.lru_cache(maxsize=1024)
+def _validate_ymd(value: str) -> datetime.date:
+    """Parse a "YYYY-MM-DD" string into a date, raising ValueError if it is not a valid date."""
+    match = _YMD_RE.fullmatch(value)
+    if not match:
+        raise ValueError(f"date '{value}' does not match format YYYY-MM-DD")
+    year, month, day = match.groups()
+    return datetime.date(int(year), int(month), int(day))
+
+def _is_settled(day: datetime.date) -> bool:
+    """Return True if data for `day` is old enough to be cached long-term."""
+    return day <= datetime.date.today() - _SETTLED_AGE
@@ -0,0 +1,51 @@
+from functools import partial
+import anyio
+from mcp.server.fastmcp import FastMCP as _FastMCP
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+class FastMCP(_FastMCP):
+    """FastMCP that builds the tools/list response once and runs on uvloop when installed.
+
+    Every client calls tools/list when a session starts, and all tools are
+    registered at import time, so the list only needs rebuilding when a tool
+    is added or removed.
+    """
+
+    _tools_list_cache = None
+
+    def add_tool(self, *args, **kwargs):
+        self._tools_list_cache = None
+        return super().add_tool(*args, **kwargs)
+
+    def remove_tool(self, name: str):
+        self._tools_list_cache = None
+        return super().remove_tool(name)
+
+    async def list_tools(self):
+        """List all available tools, from the cache when it is current."""
+        if self._tools_list_cache is None:
+            self._tools_list_cache = await super().list_tools()
+        # Return a copy so callers cannot alter the cached list
+        return list(self._tools_list_cache)
+
+    def run(self, transport: str = "stdio", mount_path: str = None):
+        """Run the server, on uvloop's faster event loop when it is installed.
+
+        uvloop is handed to anyio as the loop factory rather than installed as the
+        global event loop policy, which is deprecated from Python 3.12.
+        """
+        if uvloop is None:
+            return super().run(transport, mount_path)
+        if transport == "stdio":
+            main = self.run_stdio_async
+        elif transport == "sse":
+            main = partial(self.run_sse_async, mount_path)
+        elif transport == "streamable-http":
+            main = self.run_streamable_http_async
+        else:
+            raise ValueError(f"Unknown transport: {transport}")
+        anyio.run(main, backend_options={"use_uvloop": True})
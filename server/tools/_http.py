@@ -0,0 +1,150 @@
+import asyncio
+import email.utils
+import math
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+import httpx
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+# Shared HTTP client so every tool reuses pooled keep-alive connections.
+# With h2 installed, concurrent requests to the same host are multiplexed over one HTTP/2 connection.
+_CLIENT = httpx.AsyncClient(
+    http2=h2 is not None,
+    timeout=httpx.Timeout(30.0, connect=10.0),
+    follow_redirects=True,
+    limits=httpx.Limits(max_connections=500, max_keepalive_connections=100, keepalive_expiry=60.0),
+    headers={"User-Agent": "nasa-mcp/1.0"}
+)
+
+# Bulkheads capping concurrent in-flight requests per upstream host
+_NASA_SEM = asyncio.Semaphore(10)
+_GIBS_SEM = asyncio.Semaphore(20)
+
+class RateLimitError(Exception):
+    """Raised when the request budget is spent and the next token is too far away to wait for."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Rate limit reached, retry in {math.ceil(retry_after)} s")
+
+class _TokenBucket:
+    """Async token bucket allowing `rate` requests per `per` seconds, in bursts of up to `rate`.
+
+    A caller waits for the next token only if it arrives within `max_wait` seconds;
+    otherwise acquire() raises RateLimitError so the tool call fails fast instead of
+    stalling until the MCP client times out.
+    """
+
+    def __init__(self, rate: float, per: float = 3600.0, max_wait: float = 5.0):
+        self._capacity = float(rate)
+        self._tokens = float(rate)
+        self._fill_rate = rate / per
+        self._max_wait = max_wait
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        """Consume one token, waiting briefly for it if needed."""
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._fill_rate)
+        self._updated = now
+        wait = max(0.0, (1 - self._tokens) / self._fill_rate)
+        if wait > self._max_wait:
+            raise RateLimitError(wait)
+        # Reserve the token before sleeping; the negative balance makes later callers wait their turn
+        self._tokens -= 1
+        if wait:
+            await asyncio.sleep(wait)
+
+# api.nasa.gov allows 30 requests/hour with DEMO_KEY and 1000/hour with a real key; stay below both
+_NASA_LIMITER = _TokenBucket(25 if os.getenv("NASA_API_KEY", "DEMO_KEY") == "DEMO_KEY" else 900)
+
+# Transient statuses worth retrying; anything else (e.g. 400, 403) is returned as-is
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Give up instead of waiting when the server asks for a longer pause than this (seconds)
+MAX_RETRY_AFTER = 30.0
+
+def _retry_after(response: httpx.Response):
+    """Return the Retry-After delay in seconds, or None if the header is missing or invalid."""
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+async def get_with_retry(url: str, *, sem: asyncio.Semaphore = _NASA_SEM, limiter: _TokenBucket = None, stream: bool = False, max_attempts: int = 4, base: float = 0.5, **kwargs) -> httpx.Response:
+    """GET a URL with the shared client, retrying timeouts and transient HTTP errors.
+
+    Each attempt holds `sem`, bounding concurrent requests to the upstream host;
+    the slot is released while backing off. With a `limiter`, every attempt,
+    retries included, takes a token from it. Retries use exponential backoff with
+    full jitter, honoring Retry-After on 429. The last response is returned once
+    attempts run out, so callers keep handling HTTP errors with raise_for_status().
+
+    With stream=True the body is not read; the caller must close the returned
+    response with `await response.aclose()`.
+    """
+    for attempt in range(max_attempts):
+        last_attempt = attempt == max_attempts - 1
+        if limiter is not None:
+            await limiter.acquire()
+        try:
+            async with sem:
+                request = _CLIENT.build_request("GET", url, **kwargs)
+                response = await _CLIENT.send(request, stream=stream)
+        except httpx.TimeoutException:
+            if last_attempt:
+                raise
+            delay = None
+        else:
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+            delay = _retry_after(response) if response.status_code == 429 else None
+            if delay is not None and delay > MAX_RETRY_AFTER:
+                return response
+            await response.aclose()
+        if delay is None:
+            delay = random.uniform(0, base * 2 ** attempt)
+        await asyncio.sleep(delay)
+
+async def nasa_get(url: str, **kwargs) -> httpx.Response:
+    """GET an api.nasa.gov URL within the API key's hourly rate limit, with retries.
+
+    Raises RateLimitError when the hourly budget is spent.
+    """
+    return await get_with_retry(url, limiter=_NASA_LIMITER, **kwargs)
+
+def response_json(response: httpx.Response):
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+async def close():
+    """Close the shared HTTP client and release pooled connections"""
+    await _CLIENT.aclose()
+
+@asynccontextmanager
+async def lifespan(server):
+    """FastMCP lifespan that closes the shared HTTP client when the server shuts down"""
+    try:
+        yield
+    finally:
+        await close()
@@ -1,18 +1,20 @@
 
+import asyncio
 import datetime
 import os
+from functools import lru_cache
 from typing import Any, Optional
 import httpx
 import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
-from mcp.server.fastmcp import FastMCP
-from mars_img import get_mars_image_definition
-from earth_img import get_earth_image_definition
+from _fastmcp import FastMCP
+from mars_img import get_mars_image_definition, get_mars_images_batch
+from earth_img import get_earth_image_definition, get_earth_images_batch
+from _http import lifespan
+from weather_alerts import get_alerts_definition
+from _cache import ttl_cache
 
-mcp = FastMCP("weather")
-
-NWS_API_BASE = "https://api.weather.gov"
-USER_AGENT = "weather-app/1.0"
+mcp = FastMCP("weather", lifespan=lifespan)
 
 MARS_BASE_API = "https://api.nasa.gov/mars-photos/api/v1/rovers/curiosity/photos?"
 NASA_API_KEY = os.getenv("NASA_API_KEY", "DEMO_KEY")
@@ -22,47 +24,35 @@ AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 
-async def make_nws_request(url):
-    """Make request to NWS API with proper error handling"""
-    header = {
-        "User-agent" : USER_AGENT,
-        "Accept" : "application/geo+json"
-    }
-    async with httpx.AsyncClient() as clint:
-        try:
-            response = await clint.get(url, headers=header, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            return None
+@lru_cache(maxsize=None)
+def _get_client(service: str, region: str, access_key: Optional[str], secret_key: Optional[str]):
+    """Create a boto3 client once per service/region/credentials and reuse it afterwards"""
+    if access_key and secret_key:
+        return boto3.client(
+            service,
+            region_name=region,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key
+        )
+    # Use default credential chain (IAM roles, profiles, etc.)
+    return boto3.client(service, region_name=region)
 
-def get_bedrock_client():
-    """Initialize and return AWS Bedrock Runtime client"""
+def get_bedrock_client(*, session: Optional[boto3.Session] = None, client: Optional[Any] = None):
+    """Initialize and return AWS Bedrock Runtime client
+    
+    A pre-built client is returned as-is. A session (e.g. with SSO or assume-role
+    credentials) is used to build the client instead of the environment variables;
+    that client is not cached, so the caller owns the session's lifetime.
+    """
+    if client is not None:
+        return client
     try:
-        if AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY:
-            return boto3.client(
-                'bedrock-agent-runtime',
-                region_name=AWS_REGION,
-                aws_access_key_id=AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=AWS_SECRET_ACCESS_KEY
-            )
-        else:
-            # Use default credential chain (IAM roles, profiles, etc.)
-            return boto3.client('bedrock-agent-runtime', region_name=AWS_REGION)
+        if session is not None:
+            return session.client('bedrock-agent-runtime', region_name=AWS_REGION)
+        return _get_client('bedrock-agent-runtime', AWS_REGION, AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY)
     except (ClientError, NoCredentialsError) as e:
         raise Exception(f"Failed to initialize AWS Bedrock client: {str(e)}")
 
-def format_alert(feature: dict) -> str:
-    """Format an alert feature into a readable string."""
-    props = feature["properties"]
-    return f"""
-    Event:{props.get ('event', 'Unknown')}
-    Area: {props.get ('areaDes', 'Unknown')} 
-    Severity: {props.get( 'severity', 'Unknown')}
-    Description: {props.get('description', 'No description available')} 
-    Instructions: {props.get('instruction', 'No specific instructions provided')}
-    """
-
 def format_retrieval_results(response):
     """Format AWS Knowledge Base retrieval results"""
     if 'retrievalResults' not in response:
@@ -92,14 +82,7 @@ async def get_alerts(state: str) -> str:
     Args:
     state: Two-letter US state code (e.g. CA, NY)
     """
-    url = f"{NWS_API_BASE}/alerts/active/area/{state}"
-    data = await make_nws_request(url)
-    if not data or "features" not in data:
-        return "Unable to fetch alerts or no alerts found."
-    if not data["features"]:
-        return "No active alerts for this state."
-    alerts = [format_alert(feature) for feature in data[ "features"]]
-    return "\n---\n".join(alerts)
+    return await get_alerts_definition(state)
 
 @mcp.tool()
 async def get_add(a, b) -> str:
@@ -130,6 +113,15 @@ async def get_mars_image_tool(earth_date: Any = None, sol: Any = None, camera: A
     """
     return await get_mars_image_definition(earth_date, sol, camera)
 
+@mcp.tool()
+async def get_mars_images_batch_tool(sols: list[int], camera: Any = None) -> str:
+    """Request Mars Rover images for several sols at once. The sols are fetched concurrently.\n
+    Parameters:\n
+        - sols: List of up to 10 Martian sols of the Rover's mission, e.g. [1000, 1001, 1002].\n
+        - camera: (optinal) Camera to use for every sol, one of FHAZ, RHAZ, MAST, CHEMCAM, MAHLI, MARDI, NAVCAM, PANCAM, MINITES.\n
+    """
+    return "\n\n".join(await get_mars_images_batch(sols, camera))
+
 @mcp.tool()
 async def get_earth_image_tool(earth_date: Any = None, type: Any = None) -> str:
     """Request to Earth Polychromatic Imaging Camera (EPIC) API. Fetch satellite images of Earth from NASA's DSCOVR satellite.\n
@@ -138,10 +130,51 @@ async def get_earth_image_tool(earth_date: Any = None, type: Any = None) -> str:
         - type: (optional) Type of image to retrieve. Options are:\n
             "natural" - Natural color images (default)\n
             "enhanced" - Enhanced color images\n
-            "cloud" - Cloud color images
+            "cloud" - Cloud color images\n
+    A list of up to 10 dates may be passed as earth_date to fetch several days at once.\n
     """
+    if isinstance(earth_date, list):
+        return "\n\n".join(await get_earth_images_batch(earth_date, type))
     return await get_earth_image_definition(earth_date, type)
 
+def _do_retrieve(client, knowledge_base_id: str, query: str, max_results: int, next_token: Optional[str]):
+    """Issue a blocking Knowledge Base retrieve call and return the raw response"""
+    # Prepare the request parameters
+    request_params = {
+        'knowledgeBaseId': knowledge_base_id,
+        'retrievalQuery': {
+            'text': query
+        },
+        'retrievalConfiguration': {
+            'vectorSearchConfiguration': {
+                'numberOfResults': min(max_results, 100)
+            }
+        }
+    }
+    
+    if next_token:
+        request_params['nextToken'] = next_token
+    
+    # Make the retrieval request
+    return client.retrieve(**request_params)
+
+@ttl_cache(maxsize=1024, ttl=300)
+async def _retrieve_formatted(knowledge_base_id: str, query: str, max_results: int, next_token: Optional[str]) -> str:
+    """Retrieve from a Knowledge Base and format the results, caching the output per query"""
+    client = get_bedrock_client()
+    
+    # boto3 calls are blocking, so run the request in a worker thread
+    response = await asyncio.to_thread(_do_retrieve, client, knowledge_base_id, query, max_results, next_token)
+    
+    # Format and return the results
+    formatted_results = format_retrieval_results(response)
+    
+    # Add pagination info if available
+    if 'nextToken' in response:
+        formatted_results += f"\n\nNext Token (for pagination): {response['nextToken']}"
+    
+    return formatted_results
+
 @mcp.tool()
 async def retrieve_from_knowledge_base(
     knowledge_base_id: str,
@@ -158,38 +191,26 @@ async def retrieve_from_knowledge_base(
         next_token: Token for pagination (optional)
     """
     try:
-        client = get_bedrock_client()
+        # Repeated queries within a few minutes are answered from the cache
+        return await _retrieve_formatted(knowledge_base_id, query.strip(), max_results, next_token)
         
-        # Prepare the request parameters
-        request_params = {
+    except Exception as e:
+        return f"Error retrieving from knowledge base: {str(e)}"
+
+def _rag_configuration(knowledge_base_id: str, model_arn: str, number_of_results: int) -> dict:
+    """Build a fresh retrieve-and-generate configuration; callers may mutate it"""
+    return {
+        'type': 'KNOWLEDGE_BASE',
+        'knowledgeBaseConfiguration': {
             'knowledgeBaseId': knowledge_base_id,
-            'retrievalQuery': {
-                'text': query
-            },
+            'modelArn': model_arn,
             'retrievalConfiguration': {
                 'vectorSearchConfiguration': {
-                    'numberOfResults': min(max_results, 100)
+                    'numberOfResults': number_of_results
                 }
             }
         }
-        
-        if next_token:
-            request_params['nextToken'] = next_token
-        
-        # Make the retrieval request
-        response = client.retrieve(**request_params)
-        
-        # Format and return the results
-        formatted_results = format_retrieval_results(response)
-        
-        # Add pagination info if available
-        if 'nextToken' in response:
-            formatted_results += f"\n\nNext Token (for pagination): {response['nextToken']}"
-        
-        return formatted_results
-        
-    except Exception as e:
-        return f"Error retrieving from knowledge base: {str(e)}"
+    }
 
 @mcp.tool()
 async def retrieve_and_generate(
@@ -215,37 +236,26 @@ async def retrieve_and_generate(
             'input': {
                 'text': query
             },
-            'retrieveAndGenerateConfiguration': {
-                'type': 'KNOWLEDGE_BASE',
-                'knowledgeBaseConfiguration': {
-                    'knowledgeBaseId': knowledge_base_id,
-                    'modelArn': model_arn,
-                    'retrievalConfiguration': {
-                        'vectorSearchConfiguration': {
-                            'numberOfResults': min(max_results, 100)
-                        }
-                    }
-                }
-            }
+            'retrieveAndGenerateConfiguration': _rag_configuration(knowledge_base_id, model_arn, min(max_results, 100))
         }
         
-        response = client.retrieve_and_generate(**request_params)
+        response = await asyncio.to_thread(client.retrieve_and_generate, **request_params)
         
         # Extract the generated response
-        output = response.get('output', {}).get('text', 'No response generated')
+        parts = [response.get('output', {}).get('text', 'No response generated')]
         
         # Add citation information if available
         citations = response.get('citations', [])
         if citations:
-            output += "\n\nSources:"
+            parts.append("\n\nSources:")
             for i, citation in enumerate(citations, 1):
                 for reference in citation.get('retrievedReferences', []):
                     content = reference.get('content', {}).get('text', '')[:200] + "..."
                     metadata = reference.get('metadata', {})
                     source = metadata.get('source', 'Unknown source')
-                    output += f"\n{i}. {source}: {content}"
+                    parts.append(f"\n{i}. {source}: {content}")
         
-        return output
+        return "".join(parts)
         
     except Exception as e:
         return f"Error in retrieve and generate: {str(e)}"
@@ -258,9 +268,9 @@ async def list_knowledge_bases() -> str:
     """
     try:
         # Use bedrock-agent client for listing knowledge bases
-        client = boto3.client('bedrock-agent', region_name=AWS_REGION)
+        client = _get_client('bedrock-agent', AWS_REGION, AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY)
         
-        response = client.list_knowledge_bases()
+        response = await asyncio.to_thread(client.list_knowledge_bases)
         
         if not response.get('knowledgeBaseSummaries'):
             return "No knowledge bases found in the current region."
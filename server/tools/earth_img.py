@@ -1,7 +1,43 @@
-import datetime
+import asyncio
+import logging
 import os
 from typing import Any
 import httpx
+from _http import get_with_retry, response_json
+from _cache import ttl_cache
+from _dates import _validate_ymd, _is_settled
+
+log = logging.getLogger(__name__)
+
+_EPIC_HEADERS = httpx.Headers({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive'
+})
+
+EPIC_API = "https://epic.gsfc.nasa.gov/api/"
+_ARCHIVE_API = "https://epic.gsfc.nasa.gov/archive/"
+
+_VALID_TYPES = frozenset({"natural", "enhanced", "aerosol", "cloud"})
+# Most dates one batch call may request
+MAX_BATCH = 10
+
+class _NoEpicImages(Exception):
+    """Raised when EPIC has no images for a request, so the empty listing is not cached"""
+
+@ttl_cache(maxsize=256, ttl=86400)
+async def _fetch_epic(param_url: str):
+    """Fetch and decode EPIC image metadata, cached for a day since settled dates never change"""
+    response = await get_with_retry(param_url, headers=_EPIC_HEADERS)
+    response.raise_for_status()
+    data = response_json(response)
+    if not data:
+        raise _NoEpicImages()
+    return data
+
+# The latest-images listing and recent dates fill in as new images are published, so cache them briefly
+_fetch_epic_recent = ttl_cache(maxsize=16, ttl=300)(_fetch_epic.__wrapped__)
 
 async def get_earth_image_definition(earth_date: Any = None, type: Any = None, limit: int = 1) -> str:
     """Request to Earth Polychromatic Imaging Camera (EPIC) API. Fetch satellite images of Earth from NASA's DSCOVR satellite.\n
@@ -15,114 +51,92 @@ async def get_earth_image_definition(earth_date: Any = None, type: Any = None, l
         - limit: (optional) Number of images to retrieve. Default is 1. Maximum recommended is 10.\n
     """
 
-    base_api = "https://epic.gsfc.nasa.gov/api/"
-    
     # Validate limit parameter
     if limit < 1:
         return "Error: limit must be at least 1"
     if limit > 10:
         limit = 10  # Cap at 10 for reasonable response size
     
-    # Build URL
-    param_url = base_api
-    
     # Handle image type
-    if type:
-        if type.lower() in ["natural", "enhanced", "aerosol", "cloud"]:
-            param_url += f"{type.lower()}/"
-        else:
-            return f"Error: Invalid type '{type}'. Valid options: 'natural', 'enhanced','aerosol', 'cloud'"
-    else:
-        param_url += "natural/"
-        
+    image_type = (type or "natural").lower()
+    if image_type not in _VALID_TYPES:
+        return f"Error: Invalid type '{type}'. Valid options: 'natural', 'enhanced','aerosol', 'cloud'"
+    
+    # Build URL
+    param_url = f"{EPIC_API}{image_type}/"
     
     # Handle date parameter
+    dt = None
     if earth_date:
         try:
-            datetime.datetime.strptime(earth_date, "%Y-%m-%d")
-            year, month, day = earth_date.split("-")
-            param_url += f"date/{year}-{month}-{day}"
+            dt = _validate_ymd(earth_date)
+            param_url += f"date/{dt.year:04d}-{dt.month:02d}-{dt.day:02d}"
         except ValueError:
             return "Error: earth_date must be in YYYY-MM-DD format"
     
     try:
-        # print(f"Calling EARTH API FUNCTION with URL: {param_url}")
+        log.debug("EPIC GET %s", param_url)
         
         # Make API request
-        async with httpx.AsyncClient(
-            follow_redirects=True,
-            timeout=30.0,
-            headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'application/json, text/plain, */*',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive'
-            }
-        ) as client:
-            response = await client.get(param_url, timeout=30.0)
-            # return param_url
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Check if images were found
-            if not data or len(data) == 0:
-                return "No images found for the specified parameters"
-            
-            # Determine image type from URL
-            image_type = "natural"
-            if "enhanced" in param_url:
-                image_type = "enhanced"
-            elif "aerosol" in param_url:
-                image_type = "aerosol"
-            elif "cloud" in param_url:
-                image_type = "cloud"
-            
-            # Get the requested number of images (or all available if less than limit)
-            images_to_process = data[:limit]
+        if dt is not None and _is_settled(dt):
+            data = await _fetch_epic(param_url)
+        else:
+            data = await _fetch_epic_recent(param_url)
+        
+        # Get the requested number of images (or all available if less than limit)
+        images_to_process = data[:limit]
+        
+        # Build result string
+        parts = [
+            f"Earth Image{'s' if len(images_to_process) > 1 else ''} Found!!!!!!\n",
+            f"Image Type: {image_type.title()}\n",
+            f"Images returned: {len(images_to_process)} of {len(data)} available\n\n"
+        ]
+        
+        archive_url = f"{_ARCHIVE_API}{image_type}/"
+        
+        # Process each image
+        for i, image_data in enumerate(images_to_process, 1):
+            image_date = image_data["date"]
+            image_name = image_data["image"]
+            caption = image_data.get("caption", "No caption available")
             
-            # Build result string
-            result = f"Earth Image{'s' if len(images_to_process) > 1 else ''} Found!!!!!!\n"
-            result += f"Image Type: {image_type.title()}\n"
-            result += f"Images returned: {len(images_to_process)} of {len(data)} available\n\n"
+            # Parse date to build archive URL
+            # Date format is typically "2015-10-31 00:36:33" or "2015-10-31"
+            year, month, day = image_date.split(" ", 1)[0].split("-")
             
-            # Process each image
-            for i, image_data in enumerate(images_to_process, 1):
-                image_date = image_data["date"]
-                image_name = image_data["image"]
-                caption = image_data.get("caption", "No caption available")
-                
-                # Parse date to build archive URL
-                # Date format is typically "2015-10-31 00:36:33" or "2015-10-31"
-                date_parts = image_date.split("-")
-                year = date_parts[0]
-                month = date_parts[1]
-                
-                # Handle day extraction (might have time component)
-                day_part = date_parts[2]
-                if " " in day_part:
-                    day = day_part.split(" ")[0]
-                else:
-                    day = day_part
-                
-                # Build final image URL
-                final_image_url = f"https://epic.gsfc.nasa.gov/archive/{image_type}/{year}/{month}/{day}/png/{image_name}.png"
-                
-                # Add image information to result
-                result += f"Image {i}:\n"
-                result += f"  URL: {final_image_url}\n"
-                result += f"  Date: {image_date}\n"
-                result += f"  Caption: {caption}\n"
-                
-                # Add separator between images (except for the last one)
-                if i < len(images_to_process):
-                    result += "\n"
+            # Build final image URL
+            final_image_url = f"{archive_url}{year}/{month}/{day}/png/{image_name}.png"
             
-            return result + " " + param_url
+            # Add image information to result
+            parts.append(f"Image {i}:\n  URL: {final_image_url}\n  Date: {image_date}\n  Caption: {caption}\n")
             
+            # Add separator between images (except for the last one)
+            if i < len(images_to_process):
+                parts.append("\n")
+        
+        parts.append(" " + param_url)
+        return "".join(parts)
+        
+    except _NoEpicImages:
+        return "No images found for the specified parameters"
     except httpx.TimeoutException:
         return "Error: Request timed out. Please try again."
     except httpx.HTTPStatusError as e:
         return f"Error: HTTP {e.response.status_code}"
     except Exception as e:
-        return f"Error: {str(e)}"
\ No newline at end of file
+        return f"Error: {str(e)}"
+
+async def get_earth_images_batch(dates: list, type: Any = None, limit: int = 1) -> list:
+    """Fetch EPIC images for several dates concurrently, returning one result string per date in input order.
+
+    At most MAX_BATCH dates are accepted.
+    """
+    if len(dates) > MAX_BATCH:
+        return [f"Error: at most {MAX_BATCH} dates can be requested at once"]
+    
+    results = await asyncio.gather(
+        *(get_earth_image_definition(earth_date, type, limit) for earth_date in dates),
+        return_exceptions=True
+    )
+    return [f"Error: {str(r)}" if isinstance(r, Exception) else r for r in results]
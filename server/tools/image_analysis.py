@@ -1,17 +1,137 @@
+import asyncio
 import datetime
 import os
 from typing import Any, Dict, Union
 import httpx
 import base64
-import requests
 import io
 from PIL import Image
 import mcp.types as types
+from _http import _CLIENT
 
-def analyze_image_from_url(image_url: str, max_size: int = 1024, quality: int = 85) -> dict:
+try:
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+try:
+    import pyvips
+except (ImportError, OSError):
+    pyvips = None
+
+# Images larger than this are rejected instead of being downloaded and decoded
+_MAX_IMAGE_BYTES = 25 * 1024 * 1024
+
+# Above this many source bytes, resize with libvips (when installed) instead of PIL
+_VIPS_MIN_BYTES = 2_000_000
+
+async def _fetch_image(image_url: str) -> tuple:
+    """Download an image with the shared async client and return (content, content_type).
+    
+    The body is streamed and the download is aborted once it exceeds _MAX_IMAGE_BYTES.
+    """
+    async with _CLIENT.stream("GET", image_url) as response:
+        response.raise_for_status()
+        
+        # Verify it's an image
+        content_type = response.headers.get('content-type', '')
+        if not content_type.startswith('image/'):
+            raise ValueError(f"URL does not point to an image. Content-Type: {content_type}")
+        
+        # Reject oversized images before reading the body when the server announces the size
+        content_length = response.headers.get('content-length', '')
+        if content_length.isdigit() and int(content_length) > _MAX_IMAGE_BYTES:
+            raise ValueError(f"Image too large: {content_length} bytes (limit {_MAX_IMAGE_BYTES} bytes)")
+        
+        content = bytearray()
+        async for chunk in response.aiter_bytes(65536):
+            content.extend(chunk)
+            if len(content) > _MAX_IMAGE_BYTES:
+                raise ValueError(f"Image too large: more than {_MAX_IMAGE_BYTES} bytes")
+    
+    return bytes(content), content_type
+
+def _image_result(content: bytes, encoded: bytes, mime_type: str, image_url: str, original_dimensions: tuple, processed_dimensions: tuple) -> dict:
+    """Build the analysis result dict for an encoded image."""
+    if pybase64 is not None:
+        image_base64 = pybase64.b64encode_as_string(encoded)
+    else:
+        image_base64 = base64.b64encode(encoded).decode('utf-8')
+    
+    # Get image info
+    original_size = len(content)
+    compressed_size = len(encoded)
+    
+    return {
+        "success": True,
+        "base64_data": image_base64,
+        "mime_type": mime_type,
+        "original_url": image_url,
+        "original_dimensions": original_dimensions,
+        "processed_dimensions": processed_dimensions,
+        "original_size_bytes": original_size,
+        "compressed_size_bytes": compressed_size,
+        "compression_ratio": (1 - compressed_size/original_size)*100,
+        "data_uri": f"data:{mime_type};base64,{image_base64}"
+    }
+
+def _process_image_vips(content: bytes, image_url: str, max_size: int, quality: int) -> dict:
+    """Resize and JPEG-encode image bytes with libvips, which shrinks on load and streams the pixels."""
+    original = pyvips.Image.new_from_buffer(content, "")
+    image = pyvips.Image.thumbnail_buffer(content, max_size, height=max_size, size="down")
+    if image.hasalpha():
+        image = image.flatten()
+    encoded = image.jpegsave_buffer(Q=quality)
+    return _image_result(content, encoded, 'image/jpeg', image_url, (original.width, original.height), (image.width, image.height))
+
+def _process_image(content: bytes, content_type: str, image_url: str, max_size: int, quality: int) -> dict:
+    """Decode, resize and re-encode image bytes. CPU-bound, so it is run in a worker thread."""
+    # Open the image; this only reads the header, pixels are decoded lazily
+    image_data = io.BytesIO(content)
+    image = Image.open(image_data)
+    original_dimensions = (image.width, image.height)
+    
+    # A JPEG already within max_size is sent as-is instead of being re-encoded
+    if image.format == "JPEG" and max(original_dimensions) <= max_size:
+        return _image_result(content, content, 'image/jpeg', image_url, original_dimensions, original_dimensions)
+    
+    if pyvips is not None and len(content) > _VIPS_MIN_BYTES:
+        return _process_image_vips(content, image_url, max_size, quality)
+    
+    # Let libjpeg decode large JPEGs at 1/2, 1/4 or 1/8 scale instead of full resolution
+    scale = max(image.width, image.height) / max_size
+    if scale >= 2 and image.format == "JPEG":
+        image.draft("RGB", (image.width // int(scale), image.height // int(scale)))
+    
+    # Convert to RGB if necessary (for JPEG compatibility)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGB')
+    
+    # Resize if too large; LANCZOS only pays off for small downscale ratios
+    if image.width > max_size or image.height > max_size:
+        resample = Image.Resampling.BILINEAR if scale > 4 else Image.Resampling.LANCZOS
+        image.thumbnail((max_size, max_size), resample)
+    
+    # Convert to base64
+    output_buffer = io.BytesIO()
+    
+    # Determine format based on original or use JPEG for compression
+    if content_type == 'image/png' and image.mode == 'RGBA':
+        image.save(output_buffer, format='PNG')
+        mime_type = 'image/png'
+    else:
+        image.save(output_buffer, format='JPEG', quality=quality)
+        mime_type = 'image/jpeg'
+    
+    return _image_result(content, output_buffer.getvalue(), mime_type, image_url, original_dimensions, (image.width, image.height))
+
+async def analyze_image_from_url(image_url: str, max_size: int = 1024, quality: int = 85) -> dict:
     """
     Fetch an image from URL and convert it to base64 for LLM analysis.
     
+    The download runs on the event loop via the shared async client and the PIL
+    work runs in a worker thread, so other tool calls are not blocked.
+    
     Args:
         image_url: The URL of the image to analyze
         max_size: Maximum image size in pixels (width or height). Default: 1024
@@ -22,58 +142,10 @@ def analyze_image_from_url(image_url: str, max_size: int = 1024, quality: int =
     """
     try:
         # Fetch the image
-        response = requests.get(image_url, timeout=30)
-        response.raise_for_status()
-        
-        # Verify it's an image
-        content_type = response.headers.get('content-type', '')
-        if not content_type.startswith('image/'):
-            raise ValueError(f"URL does not point to an image. Content-Type: {content_type}")
-        
-        # Open and process the image
-        image_data = io.BytesIO(response.content)
-        image = Image.open(image_data)
-        
-        # Convert to RGB if necessary (for JPEG compatibility)
-        if image.mode in ('RGBA', 'LA', 'P'):
-            image = image.convert('RGB')
-        
-        # Resize if too large
-        original_dimensions = (image.width, image.height)
-        if image.width > max_size or image.height > max_size:
-            image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-        
-        # Convert to base64
-        output_buffer = io.BytesIO()
-        
-        # Determine format based on original or use JPEG for compression
-        if content_type == 'image/png' and image.mode == 'RGBA':
-            image.save(output_buffer, format='PNG')
-            mime_type = 'image/png'
-        else:
-            image.save(output_buffer, format='JPEG', quality=quality)
-            mime_type = 'image/jpeg'
-        
-        image_base64 = base64.b64encode(output_buffer.getvalue()).decode('utf-8')
-        
-        # Get image info
-        original_size = len(response.content)
-        compressed_size = len(output_buffer.getvalue())
-        
-        return {
-            "success": True,
-            "base64_data": image_base64,
-            "mime_type": mime_type,
-            "original_url": image_url,
-            "original_dimensions": original_dimensions,
-            "processed_dimensions": (image.width, image.height),
-            "original_size_bytes": original_size,
-            "compressed_size_bytes": compressed_size,
-            "compression_ratio": (1 - compressed_size/original_size)*100,
-            "data_uri": f"data:{mime_type};base64,{image_base64}"
-        }
+        content, content_type = await _fetch_image(image_url)
+        return await asyncio.to_thread(_process_image, content, content_type, image_url, max_size, quality)
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return {"success": False, "error": f"Failed to fetch image: {str(e)}"}
     except Image.UnidentifiedImageError:
         return {"success": False, "error": "Unable to process the image. Invalid image format."}
@@ -85,7 +157,7 @@ async def mcp_analyze_image_tool_definition(image_url: str, max_size: int = 1024
     """
     MCP tool function that returns the image in a format the LLM can analyze.
     """
-    result = analyze_image_from_url(image_url, max_size, quality)
+    result = await analyze_image_from_url(image_url, max_size, quality)
     
     if result["success"]:
         return [
@@ -127,8 +199,7 @@ The image has been processed and is ready for analysis. The LLM can now analyze
 #         # test_url = "https://apod.nasa.gov/apod/image/2507/Trifid2048.jpg"
 #         test_url = "https://apod.nasa.gov/apod/image/2507/Trifid2048.jpg"
 
-#         # Using the synchronous version for testing
-#         result = analyze_image_from_url(test_url)
+#         result = await analyze_image_from_url(test_url)
         
 #         if result["success"]:
 #             print(f"Success! Image converted to base64.")
@@ -2,43 +2,17 @@ import datetime
 import os
 from typing import Any
 import httpx
-from mcp.server.fastmcp import FastMCP
-from mars_img import get_mars_image_definition
-from earth_img import get_earth_image_definition
+from _fastmcp import FastMCP
+from mars_img import get_mars_image_definition, get_mars_images_batch
+from earth_img import get_earth_image_definition, get_earth_images_batch
 from NeoWs_tool import get_neo_feed_definition
 from APOD_tool import  get_astronomy_picture_of_the_day_tool_defnition
 from GIBS_tool import get_gibs_image_definition, get_gibs_layers_definition
 from image_analysis import mcp_analyze_image_tool_definition
+from _http import lifespan
+from weather_alerts import get_alerts_definition
 
-mcp = FastMCP("weather")
-
-NWS_API_BASE = "https://api.weather.gov"
-USER_AGENT = "weather-app/1.0"
-
-async def make_nws_request(url):
-    """Make request to NWS API with proper error handling"""
-    header = {
-        "User-agent" : USER_AGENT,
-        "Accept" : "application/geo+json"
-    }
-    async with httpx.AsyncClient() as clint:
-        try:
-            response = await clint.get(url, headers=header, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            return None
-
-def format_alert(feature: dict) -> str:
-    """Format an alert feature into a readable string."""
-    props = feature["properties"]
-    return f"""
-    Event:{props.get ('event', 'Unknown')}
-    Area: {props.get ('areaDes', 'Unknown')} 
-    Severity: {props.get( 'severity', 'Unknown')}
-    Description: {props.get('description', 'No description available')} 
-    Instructions: {props.get('instruction', 'No specific instructions provided')}
-    """
+mcp = FastMCP("weather", lifespan=lifespan)
 
 @mcp.tool()
 async def get_alerts(state: str) -> str:
@@ -46,14 +20,7 @@ async def get_alerts(state: str) -> str:
     Args:
     state: Two-letter US state code (e.g. CA, NY)
     """
-    url = f"{NWS_API_BASE}/alerts/active/area/{state}"
-    data = await make_nws_request(url)
-    if not data or "features" not in data:
-        return "Unable to fetch alerts or no alerts found."
-    if not data["features"]:
-        return "No active alerts for this state."
-    alerts = [format_alert(feature) for feature in data[ "features"]]
-    return "\n---\n".join(alerts)
+    return await get_alerts_definition(state)
 
 
 @mcp.tool()
@@ -85,6 +52,15 @@ async def get_mars_image_tool(earth_date: Any = None, sol: Any = None, camera: A
     """
     return await get_mars_image_definition(earth_date, sol, camera)
 
+@mcp.tool()
+async def get_mars_images_batch_tool(sols: list[int], camera: Any = None) -> str:
+    """Request Mars Rover images for several sols at once. The sols are fetched concurrently.\n
+    Parameters:\n
+        - sols: List of up to 10 Martian sols of the Rover's mission, e.g. [1000, 1001, 1002].\n
+        - camera: (optinal) Camera to use for every sol, one of FHAZ, RHAZ, MAST, CHEMCAM, MAHLI, MARDI, NAVCAM, PANCAM, MINITES.\n
+    """
+    return "\n\n".join(await get_mars_images_batch(sols, camera))
+
 @mcp.tool()
 async def get_earth_image_tool(earth_date: Any = None, type: Any = None, limit: int = 1) -> str:
     """Request to Earth Polychromatic Imaging Camera (EPIC) API. Fetch satellite images of Earth from NASA's DSCOVR satellite.\n
@@ -96,12 +72,15 @@ async def get_earth_image_tool(earth_date: Any = None, type: Any = None, limit:
             "aerosol" - Aerosol images\n
             "cloud" - Cloud images\n
         - limit: (optional) Number of images to retrieve. Default is 1. Maximum recommended is 10.\n
+    A list of up to 10 dates may be passed as earth_date to fetch several days at once.\n
     """
 
+    if isinstance(earth_date, list):
+        return "\n\n".join(await get_earth_images_batch(earth_date, type, limit))
     return await get_earth_image_definition(earth_date, type, limit)
 
 @mcp.tool()
-async def get_astronomy_picture_of_the_day_tool(date: Any = None, start_date: Any = None, end_date: Any = None, count: Any = None) -> str:
+async def get_astronomy_picture_of_the_day_tool(date: Any = None, start_date: Any = None, end_date: Any = None, count: Any = None, parallel_fetch: bool = False) -> str:
     """
     Gets the Astronomy Picture of the Day (APOD) from the NASA website.
 
@@ -110,8 +89,9 @@ async def get_astronomy_picture_of_the_day_tool(date: Any = None, start_date: An
     start_date: (YYYY-MM-DD). Default is none. The start of a date range, when requesting date for a range of dates. Cannot be used with date.
     end_date: (YYYY-MM-DD).	Default is today.The end of the date range, when used with start_date.
     count:(int). Default is none. If this is specified then count randomly chosen images will be returned. Cannot be used with date or start_date and end_date.
+    parallel_fetch: (bool). Default is false. Fetch a start_date/end_date range of 4 to 7 days as concurrent per-day requests. Uses one API request per day and is ignored with DEMO_KEY.
     """
-    return await get_astronomy_picture_of_the_day_tool_defnition(date, start_date, end_date, count)
+    return await get_astronomy_picture_of_the_day_tool_defnition(date, start_date, end_date, count, parallel_fetch)
 
 @mcp.tool()
 async def get_neo_feed(start_date: Any = None, end_date: Any = None, limit_per_day: int = 2) -> str:
@@ -180,7 +160,7 @@ async def mcp_analyze_image_tool(image_url: str, max_size: int = 1024, quality:
 
 if __name__ == "__main__":
     # mcp.run(transport="streamable-http")
-    mcp.run(transport="studio")
+    mcp.run(transport="stdio")
 
 
 
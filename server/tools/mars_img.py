@@ -1,11 +1,67 @@
+import asyncio
 import datetime
 import os
 from typing import Any
+from urllib.parse import urlencode
 import httpx
+from _http import nasa_get, response_json
+from _cache import ttl_cache
+from _dates import _validate_ymd
 # from mcp.server.fastmcp import FastMCP
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 NASA_API_KEY = os.getenv("NASA_API_KEY", "DEMO_KEY")
 base_api = "https://api.nasa.gov/mars-photos/api/v1/rovers/curiosity/photos?"
+# Query parameters sent with every request, after the per-call ones
+_BASE_PARAMS = {"page": 1, "api_key": NASA_API_KEY}
+
+_VALID_CAMERAS = frozenset({"FHAZ", "RHAZ", "MAST", "CHEMCAM", "MAHLI", "MARDI", "NAVCAM", "PANCAM", "MINITES"})
+_VALID_CAMERAS_TEXT = "FHAZ, RHAZ, MAST, CHEMCAM, MAHLI, MARDI, NAVCAM, PANCAM, MINITES"
+
+# Most sols one batch call may request; each sol is a rate-limited api.nasa.gov request
+MAX_BATCH = 10
+
+@ttl_cache(maxsize=256, ttl=86400)
+async def _fetch_photos(api_url: str):
+    """Fetch a Mars Rover photos page and return (first photo, photo count), cached for a day for past Earth dates.
+    
+    With ijson installed the body is parsed incrementally as it streams in, so only
+    the first photo is ever materialized instead of the whole (often multi-MB) page.
+    """
+    if ijson is None:
+        response = await nasa_get(api_url)
+        response.raise_for_status()
+        photos = response_json(response).get("photos") or []
+        return (photos[0] if photos else None), len(photos)
+    
+    response = await nasa_get(api_url, stream=True)
+    try:
+        response.raise_for_status()
+        first_photo = None
+        count = 0
+        photos = ijson.sendable_list()
+        parser = ijson.items_coro(photos, "photos.item")
+        async for chunk in response.aiter_bytes():
+            parser.send(chunk)
+            if photos:
+                if first_photo is None:
+                    first_photo = photos[0]
+                count += len(photos)
+                del photos[:]
+        parser.close()
+        count += len(photos)
+        if first_photo is None and photos:
+            first_photo = photos[0]
+        return first_photo, count
+    finally:
+        await response.aclose()
+
+# Sol and current-day queries can still gain photos as they are downlinked, so cache them briefly
+_fetch_photos_recent = ttl_cache(maxsize=64, ttl=300)(_fetch_photos.__wrapped__)
 
 async def get_mars_image_definition(earth_date: Any = None, sol: Any = None, camera: Any = None) -> str:
     """Request to Mars Rover Image. Fetch any images on Mars Rover. Each rover has its own set of photos stored in the database, which can be queried separately. There are several possible queries that can be made against the API.\n
@@ -28,6 +84,7 @@ async def get_mars_image_definition(earth_date: Any = None, sol: Any = None, cam
     
     # Build parameters dictionary
     params = {}
+    earth_dt = None
     
     # Handle mutually exclusive date/sol parameters
     if sol is not None:
@@ -37,7 +94,7 @@ async def get_mars_image_definition(earth_date: Any = None, sol: Any = None, cam
     elif earth_date:
         # Validate date format
         try:
-            datetime.datetime.strptime(earth_date, "%Y-%m-%d")
+            earth_dt = _validate_ymd(earth_date)
             params["earth_date"] = earth_date
         except ValueError:
             return "Error: earth_date must be in YYYY-MM-DD format"
@@ -47,56 +104,57 @@ async def get_mars_image_definition(earth_date: Any = None, sol: Any = None, cam
     
     # Handle camera parameter
     if camera:
-        valid_cameras = [
-            "FHAZ", "RHAZ", "MAST", "CHEMCAM", "MAHLI", 
-            "MARDI", "NAVCAM", "PANCAM", "MINITES"
-        ]
         camera_upper = camera.upper()
-        if camera_upper in valid_cameras:
+        if camera_upper in _VALID_CAMERAS:
             params["camera"] = camera_upper
         else:
-            return f"Error: Invalid camera '{camera}'. Valid options: {', '.join(valid_cameras)}"
-    
-    # Build URL parameters string
-    param_url = ""
-    for param_key, param_value in params.items():
-        param_url += f"{param_key}={param_value}&"
+            return f"Error: Invalid camera '{camera}'. Valid options: {_VALID_CAMERAS_TEXT}"
     
-    # Add page and API key
-    param_url += f"page=1&api_key={NASA_API_KEY}"
-    
-    # Complete URL
-    api_url = base_api + param_url
+    # Complete URL with page and API key
+    api_url = base_api + urlencode({**params, **_BASE_PARAMS})
     
     try:
         # Make API request
-        async with httpx.AsyncClient() as client:
-            response = await client.get(api_url, timeout=30.0)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Check if photos were found
-            if not data.get("photos") or len(data["photos"]) == 0:
-                return "No images are found for the specified parameters"
-            
-            # Return first image URL
-            first_image_url = data["photos"][0]["img_src"]
-            
-            # Optional: return additional info
-            photo_info = data["photos"][0]
-            result = f"Mars Rover Image Found!\n"
-            result += f"Image URL: {first_image_url}\n"
-            result += f"Camera: {photo_info['camera']['full_name']} ({photo_info['camera']['name']})\n"
-            result += f"Earth Date: {photo_info['earth_date']}\n"
-            result += f"Sol: {photo_info['sol']}\n"
-            result += f"Total photos available: {len(data['photos'])}"
-            
-            return result
-            
+        if earth_dt is not None and earth_dt < datetime.date.today():
+            photo_info, photo_count = await _fetch_photos(api_url)
+        else:
+            photo_info, photo_count = await _fetch_photos_recent(api_url)
+        
+        # Check if photos were found
+        if photo_count == 0:
+            return "No images are found for the specified parameters"
+        
+        # Return first image URL
+        first_image_url = photo_info["img_src"]
+        
+        # Optional: return additional info
+        camera_info = photo_info['camera']
+        return "\n".join([
+            "Mars Rover Image Found!",
+            f"Image URL: {first_image_url}",
+            f"Camera: {camera_info['full_name']} ({camera_info['name']})",
+            f"Earth Date: {photo_info['earth_date']}",
+            f"Sol: {photo_info['sol']}",
+            f"Total photos available: {photo_count}"
+        ])
+        
     except httpx.TimeoutException:
         return "Error: Request timed out. Please try again."
     except httpx.HTTPStatusError as e:
         return f"Error: HTTP {e.response.status_code}"
     except Exception as e:
-        return f"Error: {str(e)}"
\ No newline at end of file
+        return f"Error: {str(e)}"
+
+async def get_mars_images_batch(sols: list, camera: Any = None) -> list:
+    """Fetch Mars Rover images for several sols concurrently, returning one result string per sol in input order.
+
+    At most MAX_BATCH sols are accepted; concurrency is bounded by the shared api.nasa.gov semaphore.
+    """
+    if len(sols) > MAX_BATCH:
+        return [f"Error: at most {MAX_BATCH} sols can be requested at once"]
+    
+    results = await asyncio.gather(
+        *(get_mars_image_definition(sol=sol, camera=camera) for sol in sols),
+        return_exceptions=True
+    )
+    return [f"Error: {str(r)}" if isinstance(r, Exception) else r for r in results]
@@ -0,0 +1,50 @@
+import httpx
+from _http import _CLIENT, response_json
+
+NWS_API_BASE = "https://api.weather.gov"
+USER_AGENT = "weather-app/1.0"
+_NWS_HEADERS = httpx.Headers({"User-Agent": USER_AGENT, "Accept": "application/geo+json"})
+
+async def make_nws_request(url):
+    """Make request to NWS API with proper error handling"""
+    try:
+        response = await _CLIENT.get(url, headers=_NWS_HEADERS)
+        response.raise_for_status()
+        return response_json(response)
+    except Exception as e:
+        return None
+
+_ALERT_TMPL = """
+    Event:{event}
+    Area: {areaDes} 
+    Severity: {severity}
+    Description: {description} 
+    Instructions: {instruction}
+    """
+
+class _AlertProperties(dict):
+    """Alert properties that fill in a default for any field the alert omits."""
+    _DEFAULTS = {
+        'description': 'No description available',
+        'instruction': 'No specific instructions provided'
+    }
+
+    def __missing__(self, key):
+        return self._DEFAULTS.get(key, 'Unknown')
+
+def format_alert(feature: dict) -> str:
+    """Format an alert feature into a readable string."""
+    return _ALERT_TMPL.format_map(_AlertProperties(feature["properties"]))
+
+async def get_alerts_definition(state: str) -> str:
+    """Get weather alerts for a US state.
+    Args:
+    state: Two-letter US state code (e.g. CA, NY)
+    """
+    url = f"{NWS_API_BASE}/alerts/active/area/{state}"
+    data = await make_nws_request(url)
+    if not data or "features" not in data:
+        return "Unable to fetch alerts or no alerts found."
+    if not data["features"]:
+        return "No active alerts for this state."
+    return "\n---\n".join(format_alert(feature) for feature in data["features"])
@@ -5,6 +5,7 @@ Setup script for NASA MCP Server testing environment.
 This script installs the required dependencies and prepares the testing environment.
 """
 
+import shutil
 import subprocess
 import sys
 import os
@@ -13,7 +14,12 @@ def install_dependencies():
     """Install required dependencies for testing."""
     print("Installing test dependencies...")
     try:
-        subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], check=True)
+        # Prefer uv when available; it resolves and installs wheels in parallel
+        uv = shutil.which("uv")
+        if uv:
+            subprocess.run([uv, "pip", "install", "--python", sys.executable, "-r", "requirements.txt"], check=True)
+        else:
+            subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], check=True)
         print("✓ Dependencies installed successfully")
         return True
     except subprocess.CalledProcessError as e:
@@ -1,14 +1,27 @@
 # src/nasa_mcp/nasa_api.py
+import asyncio
 import datetime
+import email.utils
+import math
 import os
+import random
+import time
 from typing import Any, Dict, Union
 import httpx
 import base64
-import requests
 import io
 from PIL import Image
 import mcp.types as types
 import json
+import logging
+from ._cache import ttl_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
 
 # Get NASA API key from environment variable (set by MCP client)
 NASA_API_KEY = os.getenv("NASA_API_KEY", "DEMO_KEY")
@@ -16,10 +29,175 @@ MARS_API = "https://api.nasa.gov/mars-photos/api/v1/rovers/curiosity/photos?"
 APOD_API = "https://api.nasa.gov/planetary/apod?"
 NEOWS_API = "https://api.nasa.gov/neo/rest/v1/feed?"
 
+_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+_EPIC_HEADERS = {
+    'User-Agent': _USER_AGENT,
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Encoding': 'gzip, deflate, br'
+}
+_GIBS_HEADERS = {'User-Agent': _USER_AGENT}
+_EPIC_TYPES = frozenset({"natural", "enhanced", "aerosol", "cloud"})
+
+# GIBS request defaults, shared with the tool signatures in server.py
+GIBS_DEFAULT_LAYER = "MODIS_Terra_CorrectedReflectance_TrueColor"
+GIBS_DEFAULT_BBOX = "-180,-90,180,90"
+GIBS_DEFAULT_SIZE = 512
+GIBS_DEFAULT_FORMAT = "image/png"
+GIBS_DEFAULT_PROJECTION = "epsg4326"
+
+# Shared HTTP client so every tool reuses pooled keep-alive connections
+# instead of paying a new TCP/TLS handshake per request.
+_CLIENT = httpx.AsyncClient(
+    timeout=30.0,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+)
+
+# Bulkheads capping concurrent in-flight requests per upstream host
+_NASA_SEM = asyncio.Semaphore(8)
+_GIBS_SEM = asyncio.Semaphore(20)
+
+class RateLimitError(Exception):
+    """Raised when the request budget is spent and the next token is too far away to wait for."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Rate limit reached, retry in {math.ceil(retry_after)} s")
+
+class _TokenBucket:
+    """Async token bucket allowing `rate` requests per `per` seconds, in bursts of up to `rate`.
+
+    A caller waits for the next token only if it arrives within `max_wait` seconds;
+    otherwise acquire() raises RateLimitError so the tool call fails fast.
+    """
+
+    def __init__(self, rate: float, per: float = 3600.0, max_wait: float = 5.0):
+        self._capacity = float(rate)
+        self._tokens = float(rate)
+        self._fill_rate = rate / per
+        self._max_wait = max_wait
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        """Consume one token, waiting briefly for it if needed."""
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._fill_rate)
+        self._updated = now
+        wait = max(0.0, (1 - self._tokens) / self._fill_rate)
+        if wait > self._max_wait:
+            raise RateLimitError(wait)
+        # Reserve the token before sleeping; the negative balance makes later callers wait their turn
+        self._tokens -= 1
+        if wait:
+            await asyncio.sleep(wait)
+
+# api.nasa.gov allows 30 requests/hour with DEMO_KEY and 1000/hour with a real key; stay below both
+_NASA_LIMITER = _TokenBucket(25 if NASA_API_KEY == "DEMO_KEY" else 900)
+
+# Transient statuses worth retrying; anything else (e.g. 400, 403) is returned as-is
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Give up instead of waiting when the server asks for a longer pause than this (seconds)
+MAX_RETRY_AFTER = 30.0
+
+def _retry_after(response: httpx.Response):
+    """Return the Retry-After delay in seconds, or None if the header is missing or invalid."""
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+async def _get_with_retry(url: str, *, sem: asyncio.Semaphore = _NASA_SEM, limiter: _TokenBucket = None, max_attempts: int = 4, base: float = 0.5, **kwargs) -> httpx.Response:
+    """GET a URL with the shared client, retrying timeouts and transient HTTP errors.
+
+    Each attempt holds `sem`, and the slot is released while backing off. With a
+    `limiter`, every attempt, retries included, takes a token from it. Retries use
+    exponential backoff with full jitter, honoring Retry-After on 429 and 503.
+    The last response is returned once attempts run out, so callers keep handling
+    HTTP errors with raise_for_status().
+    """
+    for attempt in range(max_attempts):
+        last_attempt = attempt == max_attempts - 1
+        if limiter is not None:
+            await limiter.acquire()
+        try:
+            async with sem:
+                response = await _CLIENT.get(url, **kwargs)
+        except httpx.TimeoutException:
+            if last_attempt:
+                raise
+            delay = None
+        else:
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                return response
+            delay = _retry_after(response) if response.status_code in (429, 503) else None
+            if delay is not None and delay > MAX_RETRY_AFTER:
+                return response
+        if delay is None:
+            delay = random.uniform(0, base * 2 ** attempt)
+        await asyncio.sleep(delay)
+
+async def _nasa_get(url: str, **kwargs) -> httpx.Response:
+    """GET an api.nasa.gov URL within the API key's hourly rate limit, with retries.
+
+    Raises RateLimitError when the hourly budget is spent.
+    """
+    return await _get_with_retry(url, limiter=_NASA_LIMITER, **kwargs)
+
+async def close_client():
+    """Close the shared HTTP client and release pooled connections"""
+    await _CLIENT.aclose()
+
+def _response_json(response: httpx.Response):
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+@ttl_cache(maxsize=256, ttl=86400)
+async def _fetch_apod(api_url: str):
+    """Fetch an APOD response. Pictures for a given date never change, so keep them for a day."""
+    response = await _nasa_get(api_url)
+    response.raise_for_status()
+    return _response_json(response)
+
+@ttl_cache(maxsize=16, ttl=300)
+async def _fetch_apod_recent(api_url: str):
+    """Fetch an APOD response that depends on today's date, cached only briefly."""
+    return await _fetch_apod.__wrapped__(api_url)
+
+@ttl_cache(maxsize=256, ttl=3600)
+async def _fetch_gibs(final_url: str) -> int:
+    """Fetch a GIBS WMS image for a fixed date and return its size in bytes.
+
+    Non-image responses (such as WMS ServiceException documents) raise, so errors are never cached.
+    """
+    response = await _get_with_retry(final_url, sem=_GIBS_SEM, headers=_GIBS_HEADERS, follow_redirects=True)
+    response.raise_for_status()
+    content_type = response.headers.get('content-type', '')
+    if not content_type.startswith('image/'):
+        # If not an image, it might be an error response
+        if 'ServiceException' in response.text or 'Error' in response.text:
+            raise ValueError("GIBS service returned an error. Please check your parameters.")
+        raise ValueError(f"Unexpected response type: {content_type}")
+    return len(response.content)
+
+# "Most recent available" imagery can change, so it is only reused briefly for rapid repeat queries
+_fetch_gibs_recent = ttl_cache(maxsize=64, ttl=60)(_fetch_gibs.__wrapped__)
+
 # Not working beyond this size for image analysis.
 max_size = 1204
 quality = 85
 
+# Images larger than this are rejected instead of being downloaded and decoded
+_MAX_IMAGE_BYTES = 25 * 1024 * 1024
+
 
 async def get_mars_image_definition(earth_date: Any = None, sol: Any = None, camera: Any = None) -> str:
     """Request to Mars Rover Image. Fetch any images on Mars Rover. Each rover has its own set of photos stored in the database, which can be queried separately. There are several possible queries that can be made against the API."""
@@ -68,33 +246,32 @@ async def get_mars_image_definition(earth_date: Any = None, sol: Any = None, cam
     
     try:
         # Make API request
-        async with httpx.AsyncClient() as client:
-            response = await client.get(api_url, timeout=30.0)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Check if photos were found
-            if not data.get("photos") or len(data["photos"]) == 0:
-                return "No images are found for the specified parameters"
-            
-            # Return first image URL and info
-            first_image_url = data["photos"][0]["img_src"]
-            photo_info = data["photos"][0]
-            
-            # Build consistent response format
-            result = {
-                "description": f"Mars Rover Image Found!\nCamera: {photo_info['camera']['full_name']} ({photo_info['camera']['name']})\nEarth Date: {photo_info['earth_date']}\nSol: {photo_info['sol']}\nTotal photos available: {len(data['photos'])}",
-                "resource": {
-                    "type": "image",
-                    "uri": first_image_url,
-                    "mimeType": "image/jpeg",
-                    "name": f"Mars_Rover_{photo_info['camera']['name']}_{photo_info['earth_date']}_Sol{photo_info['sol']}"
-                }
+        response = await _nasa_get(api_url)
+        response.raise_for_status()
+        
+        data = _response_json(response)
+        
+        # Check if photos were found
+        if not data.get("photos") or len(data["photos"]) == 0:
+            return "No images are found for the specified parameters"
+        
+        # Return first image URL and info
+        first_image_url = data["photos"][0]["img_src"]
+        photo_info = data["photos"][0]
+        
+        # Build consistent response format
+        result = {
+            "description": f"Mars Rover Image Found!\nCamera: {photo_info['camera']['full_name']} ({photo_info['camera']['name']})\nEarth Date: {photo_info['earth_date']}\nSol: {photo_info['sol']}\nTotal photos available: {len(data['photos'])}",
+            "resource": {
+                "type": "image",
+                "uri": first_image_url,
+                "mimeType": "image/jpeg",
+                "name": f"Mars_Rover_{photo_info['camera']['name']}_{photo_info['earth_date']}_Sol{photo_info['sol']}"
             }
-            
-            return str(result)
-            
+        }
+        
+        return str(result)
+        
     except httpx.TimeoutException:
         return "Error: Request timed out. Please try again."
     except httpx.HTTPStatusError as e:
@@ -138,8 +315,6 @@ async def get_astronomy_picture_of_the_day_tool_defnition(date: Any = None, star
     elif date:
         # Validate single date
         try:
-            print(date)
-            print(type(date))
             datetime.datetime.strptime(date, "%Y-%m-%d")
             params["date"] = date
         except ValueError:
@@ -157,78 +332,80 @@ async def get_astronomy_picture_of_the_day_tool_defnition(date: Any = None, star
     api_url = APOD_API + param_url
     
     try:
-        # Make API request
-        async with httpx.AsyncClient() as client:
-            response = await client.get(api_url, timeout=30.0)
-            response.raise_for_status()
+        # Make API request. count returns random pictures, so it is never cached;
+        # requests without a fixed date or end_date follow today's picture
+        if count is not None:
+            data = await _fetch_apod.__wrapped__(api_url)
+        elif "date" in params or "end_date" in params:
+            data = await _fetch_apod(api_url)
+        else:
+            data = await _fetch_apod_recent(api_url)
+        
+        # Handle both single image and multiple images response
+        if isinstance(data, list):
+            # Multiple images (from count or date range)
+            if len(data) == 0:
+                return "No APOD images found for the specified parameters"
             
-            data = response.json()
+            # For multiple images, return the first one with info about others
+            first_apod = data[0]
+            image_url = first_apod.get('hdurl') or first_apod.get('url', '')
             
-            # Handle both single image and multiple images response
-            if isinstance(data, list):
-                # Multiple images (from count or date range)
-                if len(data) == 0:
-                    return "No APOD images found for the specified parameters"
-                
-                # For multiple images, return the first one with info about others
-                first_apod = data[0]
-                image_url = first_apod.get('hdurl') or first_apod.get('url', '')
-                
-                # Determine mime type based on URL
-                mime_type = "image/jpeg"
-                if image_url.lower().endswith('.png'):
-                    mime_type = "image/png"
-                elif image_url.lower().endswith('.gif'):
-                    mime_type = "image/gif"
-                elif 'youtube.com' in image_url.lower() or 'vimeo.com' in image_url.lower():
-                    mime_type = "video/mp4"
-                
-                description = f"Found {len(data)} APOD images. Showing first image:\n"
-                description += f"Date: {first_apod.get('date', 'Unknown')}\n"
-                description += f"Title: {first_apod.get('title', 'No title')}\n"
-                description += f"Explanation: {first_apod.get('explanation', 'No explanation available')}"
-                
-                result = {
-                    "description": description,
-                    "resource": {
-                        "uri": image_url,
-                        "mimeType": mime_type,
-                        "name": f"APOD_{first_apod.get('date', 'unknown')}_{first_apod.get('title', 'untitled').replace(' ', '_')[:50]}"
-                    }
+            # Determine mime type based on URL
+            mime_type = "image/jpeg"
+            if image_url.lower().endswith('.png'):
+                mime_type = "image/png"
+            elif image_url.lower().endswith('.gif'):
+                mime_type = "image/gif"
+            elif 'youtube.com' in image_url.lower() or 'vimeo.com' in image_url.lower():
+                mime_type = "video/mp4"
+            
+            description = f"Found {len(data)} APOD images. Showing first image:\n"
+            description += f"Date: {first_apod.get('date', 'Unknown')}\n"
+            description += f"Title: {first_apod.get('title', 'No title')}\n"
+            description += f"Explanation: {first_apod.get('explanation', 'No explanation available')}"
+            
+            result = {
+                "description": description,
+                "resource": {
+                    "uri": image_url,
+                    "mimeType": mime_type,
+                    "name": f"APOD_{first_apod.get('date', 'unknown')}_{first_apod.get('title', 'untitled').replace(' ', '_')[:50]}"
                 }
-                
-                return str(result)
+            }
             
-            else:
-                # Single image
-                image_url = data.get('hdurl') or data.get('url', '')
-                
-                # Determine mime type based on URL
-                mime_type = "image/jpeg"
-                if image_url.lower().endswith('.png'):
-                    mime_type = "image/png"
-                elif image_url.lower().endswith('.gif'):
-                    mime_type = "image/gif"
-                elif 'youtube.com' in image_url.lower() or 'vimeo.com' in image_url.lower():
-                    mime_type = "video/mp4"
-                
-                description = f"NASA Astronomy Picture of the Day\n"
-                description += f"Date: {data.get('date', 'Unknown')}\n"
-                description += f"Title: {data.get('title', 'No title')}\n"
-                description += f"Explanation: {data.get('explanation', 'No explanation available')}"
-                
-                result = {
-                    "description": description,
-                    "resource": {
-                        "type": "image",
-                        "uri": image_url,
-                        "mimeType": mime_type,
-                        "name": f"APOD_{data.get('date', 'unknown')}_{data.get('title', 'untitled').replace(' ', '_')[:50]}"
-                    }
+            return str(result)
+        
+        else:
+            # Single image
+            image_url = data.get('hdurl') or data.get('url', '')
+            
+            # Determine mime type based on URL
+            mime_type = "image/jpeg"
+            if image_url.lower().endswith('.png'):
+                mime_type = "image/png"
+            elif image_url.lower().endswith('.gif'):
+                mime_type = "image/gif"
+            elif 'youtube.com' in image_url.lower() or 'vimeo.com' in image_url.lower():
+                mime_type = "video/mp4"
+            
+            description = f"NASA Astronomy Picture of the Day\n"
+            description += f"Date: {data.get('date', 'Unknown')}\n"
+            description += f"Title: {data.get('title', 'No title')}\n"
+            description += f"Explanation: {data.get('explanation', 'No explanation available')}"
+            
+            result = {
+                "description": description,
+                "resource": {
+                    "type": "image",
+                    "uri": image_url,
+                    "mimeType": mime_type,
+                    "name": f"APOD_{data.get('date', 'unknown')}_{data.get('title', 'untitled').replace(' ', '_')[:50]}"
                 }
-                
-                return str(result)
+            }
             
+            return str(result)
+        
     except httpx.TimeoutException:
         return "Error: Request timed out. Please try again."
     except httpx.HTTPStatusError as e:
@@ -288,117 +465,117 @@ async def get_neo_feed_definition(start_date: Any = None, end_date: Any = None,
     api_url = NEOWS_API + param_url
     
     try:
-        # Make API request
-        async with httpx.AsyncClient() as client:
-            response = await client.get(api_url, timeout=30.0)
-            
-            # Parse JSON response first to check for API error format
-            data = response.json()
-            
-            # Check if the response contains an API error (even with HTTP 200)
-            if "error_message" in data:
-                return f"API Error: {data.get('error_message', 'Unknown error occurred')}"
-            
-            # Check for HTTP errors after parsing JSON
-            response.raise_for_status()
-            
-            # Extract key information
-            element_count = data.get('element_count', 0)
-            near_earth_objects = data.get('near_earth_objects', {})
-            
-            if element_count == 0:
-                return "No Near Earth Objects found for the specified date range"
-            
-            # Build description with summary and detailed info
-            description = f"NASA Near Earth Objects (NEO) Feed\n"
-            description += f"Total asteroids found: {element_count}\n"
-            description += f"Showing up to {limit_per_day} asteroids per day\n"
+        # Make API request. The feed returns the whole range (up to 7 days) in one response,
+        # so it is fetched as a single request rather than fanned out per day
+        response = await _nasa_get(api_url)
+        
+        # Parse JSON response first to check for API error format
+        data = _response_json(response)
+        
+        # Check if the response contains an API error (even with HTTP 200)
+        if "error_message" in data:
+            return f"API Error: {data.get('error_message', 'Unknown error occurred')}"
+        
+        # Check for HTTP errors after parsing JSON
+        response.raise_for_status()
+        
+        # Extract key information
+        element_count = data.get('element_count', 0)
+        near_earth_objects = data.get('near_earth_objects', {})
+        
+        if element_count == 0:
+            return "No Near Earth Objects found for the specified date range"
+        
+        # Build description with summary and detailed info
+        description = f"NASA Near Earth Objects (NEO) Feed\n"
+        description += f"Total asteroids found: {element_count}\n"
+        description += f"Showing up to {limit_per_day} asteroids per day\n"
+        
+        # Add date range info
+        if params:
+            date_range = f"Date range: {params.get('start_date', 'auto')} to {params.get('end_date', 'auto')}"
+        else:
+            date_range = "Date range: Next 7 days (default)"
+        description += f"{date_range}\n\n"
+        
+        # Process each date's asteroids (limited per day)
+        total_shown = 0
+        for date_str, asteroids in near_earth_objects.items():
+            # Limit asteroids per day
+            limited_asteroids = asteroids[:limit_per_day]
+            total_shown += len(limited_asteroids)
             
-            # Add date range info
-            if params:
-                date_range = f"Date range: {params.get('start_date', 'auto')} to {params.get('end_date', 'auto')}"
-            else:
-                date_range = "Date range: Next 7 days (default)"
-            description += f"{date_range}\n\n"
+            description += f"=== {date_str} ({len(asteroids)} asteroids total, showing {len(limited_asteroids)}) ===\n"
             
-            # Process each date's asteroids (limited per day)
-            total_shown = 0
-            for date_str, asteroids in near_earth_objects.items():
-                # Limit asteroids per day
-                limited_asteroids = asteroids[:limit_per_day]
-                total_shown += len(limited_asteroids)
+            for i, asteroid in enumerate(limited_asteroids, 1):
+                description += f"\n--- Asteroid {i} ---\n"
+                description += f"Name: {asteroid.get('name', 'Unknown')}\n"
+                description += f"Absolute Magnitude: {asteroid.get('absolute_magnitude_h', 'Unknown')}\n"
                 
-                description += f"=== {date_str} ({len(asteroids)} asteroids total, showing {len(limited_asteroids)}) ===\n"
+                # Diameter estimates
+                diameter = asteroid.get('estimated_diameter', {})
+                km_diameter = diameter.get('kilometers', {})
+                if km_diameter:
+                    min_km = km_diameter.get('estimated_diameter_min', 0)
+                    max_km = km_diameter.get('estimated_diameter_max', 0)
+                    description += f"Estimated Diameter: {min_km:.3f} - {max_km:.3f} km\n"
                 
-                for i, asteroid in enumerate(limited_asteroids, 1):
-                    description += f"\n--- Asteroid {i} ---\n"
-                    description += f"Name: {asteroid.get('name', 'Unknown')}\n"
-                    description += f"Absolute Magnitude: {asteroid.get('absolute_magnitude_h', 'Unknown')}\n"
-                    
-                    # Diameter estimates
-                    diameter = asteroid.get('estimated_diameter', {})
-                    km_diameter = diameter.get('kilometers', {})
-                    if km_diameter:
-                        min_km = km_diameter.get('estimated_diameter_min', 0)
-                        max_km = km_diameter.get('estimated_diameter_max', 0)
-                        description += f"Estimated Diameter: {min_km:.3f} - {max_km:.3f} km\n"
+                # Hazard status
+                is_hazardous = asteroid.get('is_potentially_hazardous_asteroid', False)
+                description += f"Potentially Hazardous: {'Yes' if is_hazardous else 'No'}\n"
+                
+                # Close approach data
+                close_approach = asteroid.get('close_approach_data', [])
+                if close_approach:
+                    approach = close_approach[0]  # Get the first (closest) approach
+                    description += f"Close Approach Date: {approach.get('close_approach_date_full', 'Unknown')}\n"
                     
-                    # Hazard status
-                    is_hazardous = asteroid.get('is_potentially_hazardous_asteroid', False)
-                    description += f"Potentially Hazardous: {'Yes' if is_hazardous else 'No'}\n"
+                    # Velocity
+                    velocity = approach.get('relative_velocity', {})
+                    if velocity:
+                        km_per_hour = velocity.get('kilometers_per_hour', 'Unknown')
+                        description += f"Relative Velocity: {km_per_hour} km/h\n"
                     
-                    # Close approach data
-                    close_approach = asteroid.get('close_approach_data', [])
-                    if close_approach:
-                        approach = close_approach[0]  # Get the first (closest) approach
-                        description += f"Close Approach Date: {approach.get('close_approach_date_full', 'Unknown')}\n"
-                        
-                        # Velocity
-                        velocity = approach.get('relative_velocity', {})
-                        if velocity:
-                            km_per_hour = velocity.get('kilometers_per_hour', 'Unknown')
-                            description += f"Relative Velocity: {km_per_hour} km/h\n"
-                        
-                        # Miss distance
-                        miss_distance = approach.get('miss_distance', {})
-                        if miss_distance:
-                            km_distance = miss_distance.get('kilometers', 'Unknown')
-                            lunar_distance = miss_distance.get('lunar', 'Unknown')
-                            description += f"Miss Distance: {km_distance} km ({lunar_distance} lunar distances)\n"
-                        
-                        description += f"Orbiting Body: {approach.get('orbiting_body', 'Unknown')}\n"
+                    # Miss distance
+                    miss_distance = approach.get('miss_distance', {})
+                    if miss_distance:
+                        km_distance = miss_distance.get('kilometers', 'Unknown')
+                        lunar_distance = miss_distance.get('lunar', 'Unknown')
+                        description += f"Miss Distance: {km_distance} km ({lunar_distance} lunar distances)\n"
                     
-                    # NASA JPL URL for more details
-                    jpl_url = asteroid.get('nasa_jpl_url', '')
-                    if jpl_url:
-                        description += f"More Details: {jpl_url}\n"
+                    description += f"Orbiting Body: {approach.get('orbiting_body', 'Unknown')}\n"
                 
-                description += "\n"
+                # NASA JPL URL for more details
+                jpl_url = asteroid.get('nasa_jpl_url', '')
+                if jpl_url:
+                    description += f"More Details: {jpl_url}\n"
             
-            # Add summary statistics
-            hazardous_count = 0
-            for asteroids in near_earth_objects.values():
-                hazardous_count += sum(1 for ast in asteroids if ast.get('is_potentially_hazardous_asteroid', False))
-            
-            description += f"Summary:\n"
-            description += f"Total asteroids in feed: {element_count}\n"
-            description += f"Asteroids shown: {total_shown}\n"
-            description += f"Potentially hazardous asteroids (total): {hazardous_count}\n"
-            description += f"Non-hazardous asteroids (total): {element_count - hazardous_count}\n"
-            
-            # Return consistent format (no image for NEO data, so no resource)
-            result = {
-                "description": description.strip(),
-                "resource": {
-                    "type": "image",
-                    "uri": api_url,
-                    "mimeType": "application/json",
-                    "name": f"NEO_Feed_{params.get('start_date', 'auto')}_{params.get('end_date', 'auto')}"
-                }
+            description += "\n"
+        
+        # Add summary statistics
+        hazardous_count = 0
+        for asteroids in near_earth_objects.values():
+            hazardous_count += sum(1 for ast in asteroids if ast.get('is_potentially_hazardous_asteroid', False))
+        
+        description += f"Summary:\n"
+        description += f"Total asteroids in feed: {element_count}\n"
+        description += f"Asteroids shown: {total_shown}\n"
+        description += f"Potentially hazardous asteroids (total): {hazardous_count}\n"
+        description += f"Non-hazardous asteroids (total): {element_count - hazardous_count}\n"
+        
+        # Return consistent format (no image for NEO data, so no resource)
+        result = {
+            "description": description.strip(),
+            "resource": {
+                "type": "image",
+                "uri": api_url,
+                "mimeType": "application/json",
+                "name": f"NEO_Feed_{params.get('start_date', 'auto')}_{params.get('end_date', 'auto')}"
             }
-            
-            return str(result)
-            
+        }
+        
+        return str(result)
+        
     except httpx.TimeoutException:
         return "Error: Request timed out. Please try again."
     except httpx.HTTPStatusError as e:
@@ -441,18 +618,13 @@ async def get_earth_image_definition(earth_date: Any = None, type: Any = None, l
     if limit > 10:
         limit = 10  # Cap at 10 for reasonable response size
     
-    # Build URL
-    param_url = base_api
-    
     # Handle image type
-    if type:
-        if type.lower() in ["natural", "enhanced", "aerosol", "cloud"]:
-            param_url += f"{type.lower()}/"
-        else:
-            return f"Error: Invalid type '{type}'. Valid options: 'natural', 'enhanced','aerosol', 'cloud'"
-    else:
-        param_url += "natural/"
-        
+    image_type = (type or "natural").lower()
+    if image_type not in _EPIC_TYPES:
+        return f"Error: Invalid type '{type}'. Valid options: 'natural', 'enhanced','aerosol', 'cloud'"
+    
+    # Build URL
+    param_url = f"{base_api}{image_type}/"
     
     # Handle date parameter
     if earth_date:
@@ -466,82 +638,64 @@ async def get_earth_image_definition(earth_date: Any = None, type: Any = None, l
     try:
         # print(f"Calling EARTH API FUNCTION with URL: {param_url}")
         
-        # Make API request
-        async with httpx.AsyncClient(
-            follow_redirects=True,
-            timeout=30.0,
-            headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'application/json, text/plain, */*',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive'
-            }
-        ) as client:
-            response = await client.get(param_url, timeout=30.0)
-            # return param_url
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Check if images were found
-            if not data or len(data) == 0:
-                return "No images found for the specified parameters"
-            
-            # Determine image type from URL
-            image_type = "natural"
-            if "enhanced" in param_url:
-                image_type = "enhanced"
-            elif "aerosol" in param_url:
-                image_type = "aerosol"
-            elif "cloud" in param_url:
-                image_type = "cloud"
-            
-            # Get the requested number of images (or all available if less than limit)
-            images_to_process = data[:limit]
-            
-            # For consistent format, return the first image with info about others
-            first_image = images_to_process[0]
-            image_date = first_image["date"]
-            image_name = first_image["image"]
-            caption = first_image.get("caption", "No caption available")
-            
-            # Parse date to build archive URL
-            # Date format is typically "2015-10-31 00:36:33" or "2015-10-31"
-            date_parts = image_date.split("-")
-            year = date_parts[0]
-            month = date_parts[1]
-            
-            # Handle day extraction (might have time component)
-            day_part = date_parts[2]
-            if " " in day_part:
-                day = day_part.split(" ")[0]
-            else:
-                day = day_part
-            
-            # Build final image URL for the first image
-            final_image_url = f"https://epic.gsfc.nasa.gov/archive/{image_type}/{year}/{month}/{day}/png/{image_name}.png"
-            
-            # Build description
-            description = f"Earth Image{'s' if len(images_to_process) > 1 else ''} Found!\n"
-            description += f"Image Type: {image_type.title()}\n"
-            description += f"Images returned: {len(images_to_process)} of {len(data)} available\n"
-            description += f"Showing first image:\n"
-            description += f"Date: {image_date}\n"
-            description += f"Caption: {caption}"
-            
-            # Return consistent format
-            result = {
-                "description": description,
-                "resource": {
-                    "type": "image",
-                    "uri": final_image_url,
-                    "mimeType": "image/png",
-                    "name": f"Earth_{image_type}_{year}{month}{day}_{image_name}"
-                }
+        # Make API request. One metadata call lists every image for the date; the
+        # archive URLs are built from it, so there are no per-image requests to fan out
+        response = await _get_with_retry(param_url, headers=_EPIC_HEADERS, follow_redirects=True)
+        # return param_url
+        response.raise_for_status()
+        
+        data = _response_json(response)
+        
+        # Check if images were found
+        if not data or len(data) == 0:
+            return "No images found for the specified parameters"
+        
+        # Get the requested number of images (or all available if less than limit)
+        images_to_process = data[:limit]
+        
+        # For consistent format, return the first image with info about others
+        first_image = images_to_process[0]
+        image_date = first_image["date"]
+        image_name = first_image["image"]
+        caption = first_image.get("caption", "No caption available")
+        
+        # Parse date to build archive URL
+        # Date format is typically "2015-10-31 00:36:33" or "2015-10-31"
+        date_parts = image_date.split("-")
+        year = date_parts[0]
+        month = date_parts[1]
+        
+        # Handle day extraction (might have time component)
+        day_part = date_parts[2]
+        if " " in day_part:
+            day = day_part.split(" ")[0]
+        else:
+            day = day_part
+        
+        # Build final image URL for the first image
+        final_image_url = f"https://epic.gsfc.nasa.gov/archive/{image_type}/{year}/{month}/{day}/png/{image_name}.png"
+        
+        # Build description
+        description = f"Earth Image{'s' if len(images_to_process) > 1 else ''} Found!\n"
+        description += f"Image Type: {image_type.title()}\n"
+        description += f"Images returned: {len(images_to_process)} of {len(data)} available\n"
+        description += f"Showing first image:\n"
+        description += f"Date: {image_date}\n"
+        description += f"Caption: {caption}"
+        
+        # Return consistent format
+        result = {
+            "description": description,
+            "resource": {
+                "type": "image",
+                "uri": final_image_url,
+                "mimeType": "image/png",
+                "name": f"Earth_{image_type}_{year}{month}{day}_{image_name}"
             }
-            
-            return str(result)
-            
+        }
+        
+        return str(result)
+        
     except httpx.TimeoutException:
         return "Error: Request timed out. Please try again."
     except httpx.HTTPStatusError as e:
@@ -551,13 +705,13 @@ async def get_earth_image_definition(earth_date: Any = None, type: Any = None, l
     
 
 async def get_gibs_image_definition(
-    layer: str = "MODIS_Terra_CorrectedReflectance_TrueColor",
-    bbox: str = "-180,-90,180,90",
+    layer: str = GIBS_DEFAULT_LAYER,
+    bbox: str = GIBS_DEFAULT_BBOX,
     date = None,
-    width: int = 512,
-    height: int = 512,
-    format: str = "image/png",
-    projection: str = "epsg4326"
+    width: int = GIBS_DEFAULT_SIZE,
+    height: int = GIBS_DEFAULT_SIZE,
+    format: str = GIBS_DEFAULT_FORMAT,
+    projection: str = GIBS_DEFAULT_PROJECTION
 ) -> str:
     """Request to NASA GIBS (Global Imagery Browse Services) API. Fetch satellite imagery of Earth.
     
@@ -647,53 +801,36 @@ async def get_gibs_image_definition(
     
     try:
         # Make API request to check if the image is available
-        async with httpx.AsyncClient(
-            follow_redirects=True,
-            timeout=30.0,
-            headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-        ) as client:
-            response = await client.get(final_url, timeout=30.0)
-            response.raise_for_status()
-            
-            # Check if response is an image
-            content_type = response.headers.get('content-type', '')
-            if not content_type.startswith('image/'):
-                # If not an image, it might be an error response
-                error_text = response.text
-                if 'ServiceException' in error_text or 'Error' in error_text:
-                    return f"Error: GIBS service returned an error. Please check your parameters."
-                return f"Error: Unexpected response type: {content_type}"
-            
-            # Calculate approximate area covered
-            area_width = abs(max_lon - min_lon)
-            area_height = abs(max_lat - min_lat)
-            
-            # Build description
-            description = f"GIBS Satellite Image Retrieved!\n"
-            description += f"Layer: {layer}\n"
-            description += f"Date: {date if date else 'Most recent available'}\n"
-            description += f"Bounding Box: {bbox}\n"
-            description += f"Coverage Area: {area_width:.2f}° longitude * {area_height:.2f}° latitude\n"
-            description += f"Image Size: {width}*{height} pixels\n"
-            description += f"Format: {format}\n"
-            description += f"Projection: {projection.upper()}\n"
-            description += f"Image Size: {len(response.content)} bytes"
-            
-            # Return consistent format
-            result = {
-                "description": description,
-                "resource": {
-                    "type": "image",
-                    "uri": final_url,
-                    "mimeType": format,
-                    "name": f"GIBS_{layer}_{date if date else 'latest'}_{width}x{height}"
-                }
+        content_length = await (_fetch_gibs(final_url) if date else _fetch_gibs_recent(final_url))
+        
+        # Calculate approximate area covered
+        area_width = abs(max_lon - min_lon)
+        area_height = abs(max_lat - min_lat)
+        
+        # Build description
+        description = f"GIBS Satellite Image Retrieved!\n"
+        description += f"Layer: {layer}\n"
+        description += f"Date: {date if date else 'Most recent available'}\n"
+        description += f"Bounding Box: {bbox}\n"
+        description += f"Coverage Area: {area_width:.2f}° longitude * {area_height:.2f}° latitude\n"
+        description += f"Image Size: {width}*{height} pixels\n"
+        description += f"Format: {format}\n"
+        description += f"Projection: {projection.upper()}\n"
+        description += f"Image Size: {content_length} bytes"
+        
+        # Return consistent format
+        result = {
+            "description": description,
+            "resource": {
+                "type": "image",
+                "uri": final_url,
+                "mimeType": format,
+                "name": f"GIBS_{layer}_{date if date else 'latest'}_{width}x{height}"
             }
-            
-            return str(result)
-            
+        }
+        
+        return str(result)
+        
     except httpx.TimeoutException:
         return "Error: Request timed out. Please try again."
     except httpx.HTTPStatusError as e:
@@ -707,6 +844,7 @@ async def get_gibs_image_definition(
         return f"Error: {str(e)}"
 
 
+@ttl_cache(maxsize=1, ttl=86400)
 async def get_gibs_layers_definition() -> str:
     """Get information about available GIBS layers and their capabilities."""
     
@@ -776,19 +914,12 @@ async def get_gibs_layers_definition() -> str:
     return str(result)
 
 
-def analyze_image_from_url(image_url: str) -> dict:
-    """
-    Fetch an image from URL and convert it to base64 for LLM analysis.
+async def _fetch_image(image_url: str) -> tuple:
+    """Download an image with the shared client and return (content, content_type).
     
-    Args:
-        image_url: The URL of the image to analyze
-    
-    Returns:
-        Dict containing base64 image data and metadata
+    The body is streamed and the download is aborted once it exceeds _MAX_IMAGE_BYTES.
     """
-    try:
-        # Fetch the image
-        response = requests.get(image_url, timeout=30)
+    async with _CLIENT.stream("GET", image_url, follow_redirects=True) as response:
         response.raise_for_status()
         
         # Verify it's an image
@@ -796,50 +927,97 @@ def analyze_image_from_url(image_url: str) -> dict:
         if not content_type.startswith('image/'):
             raise ValueError(f"URL does not point to an image. Content-Type: {content_type}")
         
-        # Open and process the image
-        image_data = io.BytesIO(response.content)
-        image = Image.open(image_data)
-        
-        # Convert to RGB if necessary (for JPEG compatibility)
-        if image.mode in ('RGBA', 'LA', 'P'):
-            image = image.convert('RGB')
+        # Reject oversized images before reading the body when the server announces the size
+        content_length = response.headers.get('content-length', '')
+        if content_length.isdigit() and int(content_length) > _MAX_IMAGE_BYTES:
+            raise ValueError(f"Image too large: {content_length} bytes (limit {_MAX_IMAGE_BYTES} bytes)")
         
-        # Resize if too large
-        original_dimensions = (image.width, image.height)
-        if image.width > max_size or image.height > max_size:
-            image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-        
-        # Convert to base64
-        output_buffer = io.BytesIO()
-        
-        # Determine format based on original or use JPEG for compression
-        if content_type == 'image/png' and image.mode == 'RGBA':
-            image.save(output_buffer, format='PNG')
-            mime_type = 'image/png'
-        else:
-            image.save(output_buffer, format='JPEG', quality=quality)
-            mime_type = 'image/jpeg'
-        
-        image_base64 = base64.b64encode(output_buffer.getvalue()).decode('utf-8')
-        
-        # Get image info
-        original_size = len(response.content)
-        compressed_size = len(output_buffer.getvalue())
-        
-        return {
-            "success": True,
-            "base64_data": image_base64,
-            "mime_type": mime_type,
-            "original_url": image_url,
-            "original_dimensions": original_dimensions,
-            "processed_dimensions": (image.width, image.height),
-            "original_size_bytes": original_size,
-            "compressed_size_bytes": compressed_size,
-            "compression_ratio": (1 - compressed_size/original_size)*100,
-            "data_uri": f"data:{mime_type};base64,{image_base64}"
-        }
-        
-    except requests.RequestException as e:
+        content = bytearray()
+        async for chunk in response.aiter_bytes(65536):
+            content.extend(chunk)
+            if len(content) > _MAX_IMAGE_BYTES:
+                raise ValueError(f"Image too large: more than {_MAX_IMAGE_BYTES} bytes")
+    
+    return bytes(content), content_type
+
+
+def _process_image(content: bytes, content_type: str, image_url: str) -> dict:
+    """Decode, downscale and re-encode an image. Blocking; run it in a worker thread."""
+    # Open and process the image
+    image_data = io.BytesIO(content)
+    image = Image.open(image_data)
+    original_dimensions = (image.width, image.height)
+    
+    # Let libjpeg decode large JPEGs at 1/2, 1/4 or 1/8 scale instead of full resolution
+    scale = max(image.width, image.height) / max_size
+    if scale >= 2 and image.format == "JPEG":
+        image.draft("RGB", (image.width // int(scale), image.height // int(scale)))
+    
+    # Convert to RGB if necessary (for JPEG compatibility)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGB')
+    
+    # Resize if too large; LANCZOS only pays off for small downscale ratios
+    if image.width > max_size or image.height > max_size:
+        resample = Image.Resampling.BILINEAR if scale > 4 else Image.Resampling.LANCZOS
+        image.thumbnail((max_size, max_size), resample)
+    
+    # Convert to base64
+    output_buffer = io.BytesIO()
+    
+    # Determine format based on original or use JPEG for compression
+    if content_type == 'image/png' and image.mode == 'RGBA':
+        image.save(output_buffer, format='PNG')
+        mime_type = 'image/png'
+    else:
+        image.save(output_buffer, format='JPEG', quality=quality)
+        mime_type = 'image/jpeg'
+    
+    image_base64 = base64.b64encode(output_buffer.getvalue()).decode('utf-8')
+    
+    # Get image info
+    original_size = len(content)
+    compressed_size = len(output_buffer.getvalue())
+    
+    return {
+        "success": True,
+        "base64_data": image_base64,
+        "mime_type": mime_type,
+        "original_url": image_url,
+        "original_dimensions": original_dimensions,
+        "processed_dimensions": (image.width, image.height),
+        "original_size_bytes": original_size,
+        "compressed_size_bytes": compressed_size,
+        "compression_ratio": (1 - compressed_size/original_size)*100,
+        "data_uri": f"data:{mime_type};base64,{image_base64}"
+    }
+
+
+@ttl_cache(maxsize=32, ttl=3600)
+async def _load_image(image_url: str) -> dict:
+    """Fetch and process an image for analyze_image_from_url.
+
+    Results are kept per URL for an hour so repeated analysis of the same image skips
+    the download and re-encoding. Failures raise and are not cached.
+    """
+    content, content_type = await _fetch_image(image_url)
+    # PIL work is CPU-bound, so keep it off the event loop
+    return await asyncio.to_thread(_process_image, content, content_type, image_url)
+
+
+async def analyze_image_from_url(image_url: str) -> dict:
+    """
+    Fetch an image from URL and convert it to base64 for LLM analysis.
+    
+    Args:
+        image_url: The URL of the image to analyze
+    
+    Returns:
+        Dict containing base64 image data and metadata
+    """
+    try:
+        return await _load_image(image_url)
+    except httpx.HTTPError as e:
         return {"success": False, "error": f"Failed to fetch image: {str(e)}"}
     except Image.UnidentifiedImageError:
         return {"success": False, "error": "Unable to process the image. Invalid image format."}
@@ -850,9 +1028,9 @@ async def mcp_analyze_image_tool_definition(image_url: str):
     """
     MCP tool function that returns the image in a format the LLM can analyze.
     """
-    result = analyze_image_from_url(image_url)
-    logger.debug(f"Base64 length: {len(result['base64_data'])} characters")
+    result = await analyze_image_from_url(image_url)
     if result["success"]:
+        logger.debug(f"Base64 length: {len(result['base64_data'])} characters")
         # Return the image data as a formatted string for the MCP tool
         # response = {
         #     # "success": True,
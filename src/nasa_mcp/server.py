@@ -1,14 +1,25 @@
 # src/nasa_mcp/server.py
 import asyncio
+import os
 import sys
+from contextlib import asynccontextmanager
 from typing import Any
-from mcp.server.fastmcp import FastMCP
+from ._fastmcp import FastMCP
 # from .nasa_api import get_earth_image_definition, get_gibs_image_definition, get_gibs_layers_definition, get_mars_image_definition, get_astronomy_picture_of_the_day_tool_defnition, get_neo_feed_definition, mcp_analyze_image_tool_definition
-from .nasa_api import get_earth_image_definition, get_gibs_image_definition, get_gibs_layers_definition, get_mars_image_definition, get_astronomy_picture_of_the_day_tool_defnition, get_neo_feed_definition, mcp_analyze_image_tool_definition
+from .nasa_api import get_earth_image_definition, get_gibs_image_definition, get_gibs_layers_definition, get_mars_image_definition, get_astronomy_picture_of_the_day_tool_defnition, get_neo_feed_definition, mcp_analyze_image_tool_definition, close_client
+from .nasa_api import GIBS_DEFAULT_LAYER, GIBS_DEFAULT_BBOX, GIBS_DEFAULT_SIZE, GIBS_DEFAULT_FORMAT, GIBS_DEFAULT_PROJECTION
 import mcp.types as types
 
+@asynccontextmanager
+async def lifespan(server):
+    """Close the shared HTTP client when the server shuts down"""
+    try:
+        yield
+    finally:
+        await close_client()
+
 # Create FastMCP server instance
-mcp = FastMCP("nasa-mcp-server")
+mcp = FastMCP("nasa-mcp-server", lifespan=lifespan)
 
 @mcp.tool()
 async def get_apod(date: Any = None, start_date: Any = None, end_date: Any = None, count: Any = None) -> str:
@@ -73,13 +84,13 @@ async def get_earth_image_tool(earth_date: Any = None, type: Any = None, limit:
 
 @mcp.tool()
 async def get_gibs_image(
-    layer: str = "MODIS_Terra_CorrectedReflectance_TrueColor",
-    bbox: str = "-180,-90,180,90",
+    layer: str = GIBS_DEFAULT_LAYER,
+    bbox: str = GIBS_DEFAULT_BBOX,
     date: Any = None,
-    width: int = 512,
-    height: int = 512,
-    format: str = "image/png",
-    projection: str = "epsg4326"
+    width: int = GIBS_DEFAULT_SIZE,
+    height: int = GIBS_DEFAULT_SIZE,
+    format: str = GIBS_DEFAULT_FORMAT,
+    projection: str = GIBS_DEFAULT_PROJECTION
 ) -> str:
     """Request to NASA GIBS (Global Imagery Browse Services) API. Fetch satellite imagery of Earth.
     
@@ -121,9 +132,10 @@ async def get_image_analyze(image_url: str) -> types.ImageContent:
 
 def main():
     """Main entry point for the server"""
-    # Use stdio transport for standard MCP clients (Claude Desktop, VS Code)
-    mcp.run(transport="stdio")
-    # mcp.run(transport="streamable-http")
+    # Use stdio transport for standard MCP clients (Claude Desktop, VS Code).
+    # Set MCP_TRANSPORT=streamable-http (or sse) to serve HTTP clients over the SDK's
+    # native transport, which keeps one session per client instead of one per request.
+    mcp.run(transport=os.getenv("MCP_TRANSPORT", "stdio"))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,6 +5,7 @@ Setup script for NASA MCP Server testing environment.
 This script installs the required dependencies and prepares the testing environment.
 """
 
+import shutil
 import subprocess
 import sys
 import os
@@ -16,7 +17,12 @@ def install_dependencies():
         # Go to parent directory to find requirements.txt
         parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         requirements_path = os.path.join(parent_dir, "requirements.txt")
-        subprocess.run([sys.executable, "-m", "pip", "install", "-r", requirements_path], check=True)
+        # Prefer uv when available; it resolves and installs wheels in parallel
+        uv = shutil.which("uv")
+        if uv:
+            subprocess.run([uv, "pip", "install", "--python", sys.executable, "-r", requirements_path], check=True)
+        else:
+            subprocess.run([sys.executable, "-m", "pip", "install", "-r", requirements_path], check=True)
         print("✓ Dependencies installed successfully")
         return True
     except subprocess.CalledProcessError as e:
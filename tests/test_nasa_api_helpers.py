@@ -0,0 +1,173 @@
+import pytest
+import email.utils
+import sys
+import os
+from unittest.mock import patch, AsyncMock
+import httpx
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from nasa_mcp import nasa_api
+from nasa_mcp import _cache
+from nasa_mcp._cache import ttl_cache
+from nasa_mcp.nasa_api import _TokenBucket, RateLimitError, _get_with_retry, MAX_RETRY_AFTER
+
+
+class FakeClock:
+    """Stand-in for the time module whose clock only moves when told to."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def mock_client(handler):
+    """Build an AsyncClient that answers every request with handler(request)."""
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestTTLCache:
+    """Test cases for the nasa_mcp copy of the ttl_cache decorator."""
+
+    @pytest.mark.asyncio
+    async def test_caches_until_ttl_expires(self):
+        """Test that results are reused within the TTL and refetched after it."""
+        clock = FakeClock()
+        calls = []
+
+        with patch.object(_cache, "time", clock):
+            @ttl_cache(maxsize=8, ttl=60)
+            async def fetch(key):
+                calls.append(key)
+                return f"value-{len(calls)}"
+
+            assert await fetch("a") == "value-1"
+            clock.advance(59)
+            assert await fetch("a") == "value-1"
+            clock.advance(2)
+            assert await fetch("a") == "value-2"
+
+    @pytest.mark.asyncio
+    async def test_exceptions_are_not_cached(self):
+        """Test that a failing call is retried on the next call instead of cached."""
+        calls = []
+
+        @ttl_cache(maxsize=8, ttl=60)
+        async def fetch(key):
+            calls.append(key)
+            if len(calls) == 1:
+                raise ValueError("upstream failed")
+            return "ok"
+
+        with pytest.raises(ValueError):
+            await fetch("a")
+        assert await fetch("a") == "ok"
+        assert await fetch("a") == "ok"
+        assert len(calls) == 2
+
+
+class TestGetWithRetry:
+    """Test cases for _get_with_retry and _nasa_get in nasa_mcp."""
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_status_then_succeeds(self):
+        """Test that a 500 is retried with jittered backoff and the later 200 returned."""
+        statuses = [500, 200]
+
+        def handler(request):
+            return httpx.Response(statuses.pop(0))
+
+        with patch.object(nasa_api, "_CLIENT", mock_client(handler)), \
+             patch("asyncio.sleep", new_callable=AsyncMock) as sleep, \
+             patch.object(nasa_api.random, "uniform", return_value=0.25):
+            response = await _get_with_retry("https://api.nasa.gov/test")
+        assert response.status_code == 200
+        sleep.assert_awaited_once_with(0.25)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", [429, 503])
+    async def test_honors_retry_after_seconds(self, status):
+        """Test that Retry-After in seconds sets the delay on 429 and 503."""
+        responses = [httpx.Response(status, headers={"retry-after": "7"}), httpx.Response(200)]
+
+        def handler(request):
+            return responses.pop(0)
+
+        with patch.object(nasa_api, "_CLIENT", mock_client(handler)), \
+             patch("asyncio.sleep", new_callable=AsyncMock) as sleep:
+            response = await _get_with_retry("https://api.nasa.gov/test")
+        assert response.status_code == 200
+        sleep.assert_awaited_once_with(7.0)
+
+    @pytest.mark.asyncio
+    async def test_honors_retry_after_http_date(self):
+        """Test that Retry-After as an HTTP date is turned into a delay from now."""
+        clock = FakeClock(now=1_700_000_000.0)
+        retry_at = email.utils.formatdate(clock.now + 12, usegmt=True)
+        responses = [httpx.Response(429, headers={"retry-after": retry_at}), httpx.Response(200)]
+
+        def handler(request):
+            return responses.pop(0)
+
+        with patch.object(nasa_api, "_CLIENT", mock_client(handler)), \
+             patch.object(nasa_api, "time", clock), \
+             patch("asyncio.sleep", new_callable=AsyncMock) as sleep:
+            await _get_with_retry("https://api.nasa.gov/test")
+        sleep.assert_awaited_once_with(pytest.approx(12.0))
+
+    @pytest.mark.asyncio
+    async def test_gives_up_on_long_retry_after(self):
+        """Test that a Retry-After beyond MAX_RETRY_AFTER returns the response without waiting."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(429, headers={"retry-after": str(int(MAX_RETRY_AFTER) + 1)})
+
+        with patch.object(nasa_api, "_CLIENT", mock_client(handler)), \
+             patch("asyncio.sleep", new_callable=AsyncMock) as sleep:
+            response = await _get_with_retry("https://api.nasa.gov/test")
+        assert response.status_code == 429
+        assert len(requests) == 1
+        sleep.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_nasa_get_is_rate_limited(self):
+        """Test that _nasa_get charges the api.nasa.gov limiter and fails fast once it is spent."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200)
+
+        clock = FakeClock()
+        with patch.object(nasa_api, "time", clock):
+            limiter = _TokenBucket(1, per=3600.0)
+        with patch.object(nasa_api, "_CLIENT", mock_client(handler)), \
+             patch.object(nasa_api, "time", clock), \
+             patch.object(nasa_api, "_NASA_LIMITER", limiter):
+            await nasa_api._nasa_get("https://api.nasa.gov/test")
+            with pytest.raises(RateLimitError):
+                await nasa_api._nasa_get("https://api.nasa.gov/test")
+        assert len(requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_gibs_fetch_is_retried(self):
+        """Test that GIBS fetches go through the retrying helper."""
+        responses = [httpx.Response(502), httpx.Response(200, headers={"content-type": "image/png"}, content=b"png")]
+
+        def handler(request):
+            return responses.pop(0)
+
+        with patch.object(nasa_api, "_CLIENT", mock_client(handler)), \
+             patch("asyncio.sleep", new_callable=AsyncMock):
+            assert await nasa_api._fetch_gibs.__wrapped__("https://gibs.earthdata.nasa.gov/test") == 3
@@ -0,0 +1,274 @@
+import pytest
+import datetime
+import json
+import sys
+import os
+from unittest.mock import patch
+import httpx
+
+# Add the server tools directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'server', 'tools'))
+
+import _http
+import APOD_tool
+import NeoWs_tool
+import earth_img
+import mars_img
+import image_analysis
+from _http import _TokenBucket
+
+TODAY = datetime.date.today()
+SETTLED_DAY = (TODAY - datetime.timedelta(days=30)).isoformat()
+RECENT_DAY = TODAY.isoformat()
+
+APOD_BODY = {"date": SETTLED_DAY, "title": "Test", "url": "https://apod.nasa.gov/test.jpg", "explanation": "Test"}
+NEO_BODY = {"element_count": 1, "near_earth_objects": {SETTLED_DAY: [{"name": "Test", "id": "1"}]}}
+EPIC_BODY = [{"date": f"{SETTLED_DAY} 00:36:33", "image": "epic_1b_test", "caption": "Test"}]
+MARS_BODY = {"photos": [
+    {"id": i, "sol": 1000, "earth_date": "2015-05-30", "img_src": f"https://mars.nasa.gov/{i}.jpg",
+     "camera": {"name": "MAST", "full_name": "Mast Camera"}}
+    for i in range(1, 4)
+]}
+
+
+class ChunkedStream(httpx.AsyncByteStream):
+    """Response body delivered in fixed-size chunks, as a slow network would."""
+
+    def __init__(self, body: bytes, chunk_size: int):
+        self.body = body
+        self.chunk_size = chunk_size
+
+    async def __aiter__(self):
+        for i in range(0, len(self.body), self.chunk_size):
+            yield self.body[i:i + self.chunk_size]
+
+
+@pytest.fixture
+def upstream():
+    """Route the shared client to a MockTransport answering with `upstream.body`, recording requests."""
+    class Upstream:
+        body = None
+        requests = []
+
+    def handler(request):
+        Upstream.requests.append(request)
+        return httpx.Response(200, json=Upstream.body)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with patch.object(_http, "_CLIENT", client), \
+         patch.object(_http, "_NASA_LIMITER", _TokenBucket(1000)):
+        yield Upstream
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty tool caches."""
+    for cache in (APOD_tool._fetch_apod, APOD_tool._fetch_apod_recent,
+                  NeoWs_tool._fetch_neo_feed, NeoWs_tool._fetch_neo_feed_default,
+                  earth_img._fetch_epic, earth_img._fetch_epic_recent,
+                  mars_img._fetch_photos, mars_img._fetch_photos_recent):
+        cache.cache_clear()
+
+
+class TestAPODCaching:
+    """Test cases for routing APOD queries between the day-long and short caches."""
+
+    @pytest.mark.asyncio
+    async def test_settled_date_uses_long_cache(self, upstream):
+        """Test that a past date is cached for a day."""
+        upstream.body = APOD_BODY
+        with patch.object(APOD_tool, "_fetch_apod_recent") as recent:
+            await APOD_tool.get_astronomy_picture_of_the_day_tool_defnition(date=SETTLED_DAY)
+            await APOD_tool.get_astronomy_picture_of_the_day_tool_defnition(date=SETTLED_DAY)
+        recent.assert_not_called()
+        assert len(upstream.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_range_ending_today_uses_short_cache(self, upstream):
+        """Test that a range reaching today skips the day-long cache."""
+        upstream.body = [APOD_BODY]
+        start = (TODAY - datetime.timedelta(days=1)).isoformat()
+        with patch.object(APOD_tool, "_fetch_apod") as long_cache:
+            await APOD_tool.get_astronomy_picture_of_the_day_tool_defnition(start_date=start, end_date=RECENT_DAY)
+            await APOD_tool.get_astronomy_picture_of_the_day_tool_defnition(start_date=start, end_date=RECENT_DAY)
+        long_cache.assert_not_called()
+        assert len(upstream.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_count_is_never_cached(self, upstream):
+        """Test that random picks are fetched on every call."""
+        upstream.body = [APOD_BODY]
+        await APOD_tool.get_astronomy_picture_of_the_day_tool_defnition(count=1)
+        await APOD_tool.get_astronomy_picture_of_the_day_tool_defnition(count=1)
+        assert len(upstream.requests) == 2
+
+
+class TestNeoWsCaching:
+    """Test cases for routing NeoWs feeds between the day-long and short caches."""
+
+    @pytest.mark.asyncio
+    async def test_settled_range_uses_long_cache(self, upstream):
+        """Test that a range well in the past is cached for a day."""
+        upstream.body = NEO_BODY
+        with patch.object(NeoWs_tool, "_fetch_neo_feed_default") as recent:
+            result = await NeoWs_tool.get_neo_feed_definition(start_date=SETTLED_DAY, end_date=SETTLED_DAY)
+            await NeoWs_tool.get_neo_feed_definition(start_date=SETTLED_DAY, end_date=SETTLED_DAY)
+        assert "Total asteroids found: 1" in result
+        recent.assert_not_called()
+        assert len(upstream.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_open_range_reaching_today_uses_short_cache(self, upstream):
+        """Test that a start date whose 7-day window reaches today skips the day-long cache."""
+        upstream.body = NEO_BODY
+        start = (TODAY - datetime.timedelta(days=3)).isoformat()
+        with patch.object(NeoWs_tool, "_fetch_neo_feed") as long_cache:
+            await NeoWs_tool.get_neo_feed_definition(start_date=start)
+            await NeoWs_tool.get_neo_feed_definition(start_date=start)
+        long_cache.assert_not_called()
+        assert len(upstream.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_default_feed_uses_short_cache(self, upstream):
+        """Test that the default feed skips the day-long cache."""
+        upstream.body = NEO_BODY
+        with patch.object(NeoWs_tool, "_fetch_neo_feed") as long_cache:
+            await NeoWs_tool.get_neo_feed_definition()
+        long_cache.assert_not_called()
+        assert len(upstream.requests) == 1
+
+
+class TestEarthImageCaching:
+    """Test cases for routing EPIC listings between the day-long and short caches."""
+
+    @pytest.mark.asyncio
+    async def test_settled_date_uses_long_cache(self, upstream):
+        """Test that a past date is cached for a day."""
+        upstream.body = EPIC_BODY
+        with patch.object(earth_img, "_fetch_epic_recent") as recent:
+            result = await earth_img.get_earth_image_definition(earth_date=SETTLED_DAY)
+            await earth_img.get_earth_image_definition(earth_date=SETTLED_DAY)
+        assert "epic_1b_test.png" in result
+        recent.assert_not_called()
+        assert len(upstream.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_latest_images_use_short_cache(self, upstream):
+        """Test that the latest-images listing skips the day-long cache."""
+        upstream.body = EPIC_BODY
+        with patch.object(earth_img, "_fetch_epic") as long_cache:
+            await earth_img.get_earth_image_definition()
+            await earth_img.get_earth_image_definition()
+        long_cache.assert_not_called()
+        assert len(upstream.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_listing_is_not_cached(self, upstream):
+        """Test that a date without images is asked for again on the next call."""
+        upstream.body = []
+        result = await earth_img.get_earth_image_definition(earth_date=SETTLED_DAY)
+        assert result == "No images found for the specified parameters"
+        upstream.body = EPIC_BODY
+        result = await earth_img.get_earth_image_definition(earth_date=SETTLED_DAY)
+        assert "epic_1b_test.png" in result
+        assert len(upstream.requests) == 2
+
+
+class TestBatchLimits:
+    """Test cases for the MAX_BATCH caps on batch tools."""
+
+    @pytest.mark.asyncio
+    async def test_earth_batch_rejects_too_many_dates(self, upstream):
+        """Test that more than MAX_BATCH dates fail without any request."""
+        dates = [SETTLED_DAY] * (earth_img.MAX_BATCH + 1)
+        result = await earth_img.get_earth_images_batch(dates)
+        assert result == [f"Error: at most {earth_img.MAX_BATCH} dates can be requested at once"]
+        assert upstream.requests == []
+
+    @pytest.mark.asyncio
+    async def test_earth_batch_accepts_max_batch_dates(self, upstream):
+        """Test that exactly MAX_BATCH dates return one result per date."""
+        upstream.body = EPIC_BODY
+        result = await earth_img.get_earth_images_batch([SETTLED_DAY] * earth_img.MAX_BATCH)
+        assert len(result) == earth_img.MAX_BATCH
+        assert all("epic_1b_test.png" in r for r in result)
+
+    @pytest.mark.asyncio
+    async def test_mars_batch_rejects_too_many_sols(self, upstream):
+        """Test that more than MAX_BATCH sols fail without any request."""
+        result = await mars_img.get_mars_images_batch(list(range(mars_img.MAX_BATCH + 1)))
+        assert result == [f"Error: at most {mars_img.MAX_BATCH} sols can be requested at once"]
+        assert upstream.requests == []
+
+    @pytest.mark.asyncio
+    async def test_mars_batch_accepts_max_batch_sols(self, upstream):
+        """Test that exactly MAX_BATCH sols return one result per sol."""
+        upstream.body = MARS_BODY
+        result = await mars_img.get_mars_images_batch(list(range(mars_img.MAX_BATCH)))
+        assert len(result) == mars_img.MAX_BATCH
+        assert all("Total photos available: 3" in r for r in result)
+
+
+class TestMarsPhotoStreaming:
+    """Test cases for _fetch_photos' incremental ijson parsing."""
+
+    @pytest.mark.skipif(mars_img.ijson is None, reason="ijson is not installed")
+    @pytest.mark.asyncio
+    async def test_streamed_parse_matches_full_parse(self):
+        """Test that parsing a body split into small chunks gives the same result as json.loads."""
+        body = json.dumps(MARS_BODY).encode()
+
+        def handler(request):
+            return httpx.Response(200, stream=ChunkedStream(body, 7))
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch.object(_http, "_CLIENT", client), \
+             patch.object(_http, "_NASA_LIMITER", _TokenBucket(1000)):
+            first_photo, count = await mars_img._fetch_photos.__wrapped__("https://api.nasa.gov/mars-photos/test")
+        assert first_photo == MARS_BODY["photos"][0]
+        assert count == 3
+
+    @pytest.mark.asyncio
+    async def test_empty_page(self, upstream):
+        """Test that a page without photos gives no first photo and a zero count."""
+        upstream.body = {"photos": []}
+        assert await mars_img._fetch_photos.__wrapped__("https://api.nasa.gov/mars-photos/test") == (None, 0)
+
+
+class TestImageSizeCap:
+    """Test cases for the _MAX_IMAGE_BYTES cap in image_analysis._fetch_image."""
+
+    @pytest.mark.asyncio
+    async def test_rejects_announced_oversize_image(self):
+        """Test that a Content-Length above the cap fails before the body is read."""
+        def handler(request):
+            return httpx.Response(200, headers={"content-type": "image/png", "content-length": str(11)}, content=b"x" * 11)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch.object(image_analysis, "_CLIENT", client), \
+             patch.object(image_analysis, "_MAX_IMAGE_BYTES", 10):
+            with pytest.raises(ValueError, match="Image too large: 11 bytes"):
+                await image_analysis._fetch_image("https://example.com/big.png")
+
+    @pytest.mark.asyncio
+    async def test_stops_streaming_past_the_cap(self):
+        """Test that a body without Content-Length is cut off once it passes the cap."""
+        def handler(request):
+            return httpx.Response(200, headers={"content-type": "image/png"}, stream=ChunkedStream(b"x" * 30, 4))
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch.object(image_analysis, "_CLIENT", client), \
+             patch.object(image_analysis, "_MAX_IMAGE_BYTES", 10):
+            with pytest.raises(ValueError, match="more than 10 bytes"):
+                await image_analysis._fetch_image("https://example.com/big.png")
+
+    @pytest.mark.asyncio
+    async def test_accepts_image_within_the_cap(self):
+        """Test that an image at the cap is returned whole."""
+        def handler(request):
+            return httpx.Response(200, headers={"content-type": "image/png"}, stream=ChunkedStream(b"x" * 10, 4))
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch.object(image_analysis, "_CLIENT", client), \
+             patch.object(image_analysis, "_MAX_IMAGE_BYTES", 10):
+            assert await image_analysis._fetch_image("https://example.com/ok.png") == (b"x" * 10, "image/png")
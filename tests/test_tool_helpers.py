@@ -0,0 +1,363 @@
+import pytest
+import asyncio
+import sys
+import os
+from unittest.mock import patch, AsyncMock
+import httpx
+
+# Add the server tools directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'server', 'tools'))
+
+import _cache
+import _http
+from _cache import ttl_cache
+from _http import _TokenBucket, RateLimitError, get_with_retry, MAX_RETRY_AFTER
+from GIBS_tool import _BBOX_RE
+
+
+class FakeClock:
+    """Stand-in for the time module whose clock only moves when told to."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def mock_client(handler):
+    """Build an AsyncClient that answers every request with handler(request)."""
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestTTLCache:
+    """Test cases for the ttl_cache decorator."""
+
+    @pytest.mark.asyncio
+    async def test_caches_until_ttl_expires(self):
+        """Test that results are reused within the TTL and refetched after it."""
+        clock = FakeClock()
+        calls = []
+
+        with patch.object(_cache, "time", clock):
+            @ttl_cache(maxsize=8, ttl=60)
+            async def fetch(key):
+                calls.append(key)
+                return f"value-{len(calls)}"
+
+            assert await fetch("a") == "value-1"
+            clock.advance(59)
+            assert await fetch("a") == "value-1"
+            clock.advance(2)
+            assert await fetch("a") == "value-2"
+            assert calls == ["a", "a"]
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted once maxsize is reached."""
+        calls = []
+
+        @ttl_cache(maxsize=2, ttl=60)
+        async def fetch(key):
+            calls.append(key)
+            return key
+
+        await fetch("a")
+        await fetch("b")
+        await fetch("a")  # "a" is now the most recently used
+        await fetch("c")  # evicts "b"
+        await fetch("a")
+        await fetch("b")
+        assert calls == ["a", "b", "c", "b"]
+
+    @pytest.mark.asyncio
+    async def test_exceptions_are_not_cached(self):
+        """Test that a failing call is retried on the next call instead of cached."""
+        calls = []
+
+        @ttl_cache(maxsize=8, ttl=60)
+        async def fetch(key):
+            calls.append(key)
+            if len(calls) == 1:
+                raise ValueError("upstream failed")
+            return "ok"
+
+        with pytest.raises(ValueError):
+            await fetch("a")
+        assert await fetch("a") == "ok"
+        assert await fetch("a") == "ok"
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_inflight_call(self):
+        """Test that concurrent calls with the same arguments run the function once."""
+        release = asyncio.Event()
+        calls = []
+
+        @ttl_cache(maxsize=8, ttl=60)
+        async def fetch(key):
+            calls.append(key)
+            await release.wait()
+            return key.upper()
+
+        waiters = [asyncio.ensure_future(fetch("a")) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*waiters) == ["A", "A", "A"]
+        assert calls == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_shared_call(self):
+        """Test that cancelling one caller leaves the shared call running for the others."""
+        release = asyncio.Event()
+        calls = []
+
+        @ttl_cache(maxsize=8, ttl=60)
+        async def fetch(key):
+            calls.append(key)
+            await release.wait()
+            return key.upper()
+
+        first = asyncio.ensure_future(fetch("a"))
+        second = asyncio.ensure_future(fetch("a"))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        assert await second == "A"
+        assert first.cancelled()
+        assert calls == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_wrapped_bypasses_cache(self):
+        """Test that __wrapped__ calls the undecorated function every time."""
+        calls = []
+
+        @ttl_cache(maxsize=8, ttl=60)
+        async def fetch(key):
+            calls.append(key)
+            return key
+
+        await fetch("a")
+        await fetch.__wrapped__("a")
+        await fetch("a")
+        assert calls == ["a", "a"]
+
+
+class TestTokenBucket:
+    """Test cases for the api.nasa.gov rate limiter."""
+
+    @pytest.mark.asyncio
+    async def test_allows_burst_then_raises(self):
+        """Test that a full bucket allows `rate` requests, then fails fast."""
+        clock = FakeClock()
+        with patch.object(_http, "time", clock):
+            bucket = _TokenBucket(3, per=3600.0, max_wait=5.0)
+            for _ in range(3):
+                await bucket.acquire()
+            with pytest.raises(RateLimitError) as excinfo:
+                await bucket.acquire()
+        assert excinfo.value.retry_after == pytest.approx(1200.0)
+        assert "retry in 1200 s" in str(excinfo.value)
+
+    @pytest.mark.asyncio
+    async def test_refills_over_time(self):
+        """Test that tokens come back at `rate` per `per` seconds."""
+        clock = FakeClock()
+        with patch.object(_http, "time", clock):
+            bucket = _TokenBucket(2, per=3600.0, max_wait=5.0)
+            await bucket.acquire()
+            await bucket.acquire()
+            clock.advance(1800)
+            await bucket.acquire()
+            with pytest.raises(RateLimitError):
+                await bucket.acquire()
+
+    @pytest.mark.asyncio
+    async def test_waits_briefly_for_a_close_token(self):
+        """Test that a token due within max_wait is waited for instead of failing."""
+        clock = FakeClock()
+        with patch.object(_http, "time", clock), patch("asyncio.sleep", new_callable=AsyncMock) as sleep:
+            bucket = _TokenBucket(1, per=2.0, max_wait=5.0)
+            await bucket.acquire()
+            await bucket.acquire()
+        sleep.assert_awaited_once_with(pytest.approx(2.0))
+
+
+class TestGetWithRetry:
+    """Test cases for get_with_retry's retry, backoff and Retry-After handling."""
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_status_then_succeeds(self):
+        """Test that a 503 is retried and the later 200 returned."""
+        statuses = [503, 200]
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(statuses.pop(0))
+
+        with patch.object(_http, "_CLIENT", mock_client(handler)), \
+             patch("asyncio.sleep", new_callable=AsyncMock) as sleep, \
+             patch.object(_http.random, "uniform", return_value=0.25):
+            response = await get_with_retry("https://api.nasa.gov/test")
+        assert response.status_code == 200
+        assert len(requests) == 2
+        sleep.assert_awaited_once_with(0.25)
+
+    @pytest.mark.asyncio
+    async def test_returns_last_response_when_attempts_run_out(self):
+        """Test that the final 500 is returned rather than raised."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(500)
+
+        with patch.object(_http, "_CLIENT", mock_client(handler)), \
+             patch("asyncio.sleep", new_callable=AsyncMock):
+            response = await get_with_retry("https://api.nasa.gov/test", max_attempts=3)
+        assert response.status_code == 500
+        assert len(requests) == 3
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self):
+        """Test that a 400 is returned immediately."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(400)
+
+        with patch.object(_http, "_CLIENT", mock_client(handler)), \
+             patch("asyncio.sleep", new_callable=AsyncMock) as sleep:
+            response = await get_with_retry("https://api.nasa.gov/test")
+        assert response.status_code == 400
+        assert len(requests) == 1
+        sleep.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_backoff_grows_exponentially(self):
+        """Test that the jitter range doubles with each attempt."""
+        def handler(request):
+            return httpx.Response(502)
+
+        with patch.object(_http, "_CLIENT", mock_client(handler)), \
+             patch("asyncio.sleep", new_callable=AsyncMock), \
+             patch.object(_http.random, "uniform", return_value=0.0) as uniform:
+            await get_with_retry("https://api.nasa.gov/test", max_attempts=4, base=0.5)
+        assert [call.args for call in uniform.call_args_list] == [(0, 0.5), (0, 1.0), (0, 2.0)]
+
+    @pytest.mark.asyncio
+    async def test_honors_retry_after_seconds(self):
+        """Test that a 429 waits for the Retry-After delay."""
+        responses = [httpx.Response(429, headers={"Retry-After": "2"}), httpx.Response(200)]
+
+        with patch.object(_http, "_CLIENT", mock_client(lambda request: responses.pop(0))), \
+             patch("asyncio.sleep", new_callable=AsyncMock) as sleep:
+            response = await get_with_retry("https://api.nasa.gov/test")
+        assert response.status_code == 200
+        sleep.assert_awaited_once_with(2.0)
+
+    @pytest.mark.asyncio
+    async def test_honors_retry_after_http_date(self):
+        """Test that an HTTP-date Retry-After is converted to a delay."""
+        clock = FakeClock(now=1_700_000_000.0)
+        retry_at = "Tue, 14 Nov 2023 22:13:30 GMT"  # 10 s after the fake clock
+        responses = [httpx.Response(429, headers={"Retry-After": retry_at}), httpx.Response(200)]
+
+        with patch.object(_http, "_CLIENT", mock_client(lambda request: responses.pop(0))), \
+             patch.object(_http, "time", clock), \
+             patch("asyncio.sleep", new_callable=AsyncMock) as sleep:
+            await get_with_retry("https://api.nasa.gov/test")
+        sleep.assert_awaited_once_with(pytest.approx(10.0))
+
+    @pytest.mark.asyncio
+    async def test_gives_up_on_long_retry_after(self):
+        """Test that a Retry-After longer than MAX_RETRY_AFTER returns the 429 at once."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(429, headers={"Retry-After": str(int(MAX_RETRY_AFTER) + 1)})
+
+        with patch.object(_http, "_CLIENT", mock_client(handler)), \
+             patch("asyncio.sleep", new_callable=AsyncMock) as sleep:
+            response = await get_with_retry("https://api.nasa.gov/test")
+        assert response.status_code == 429
+        assert len(requests) == 1
+        sleep.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_timeouts_are_retried_then_raised(self):
+        """Test that timeouts are retried and the last one propagates."""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            raise httpx.ReadTimeout("timed out", request=request)
+
+        with patch.object(_http, "_CLIENT", mock_client(handler)), \
+             patch("asyncio.sleep", new_callable=AsyncMock):
+            with pytest.raises(httpx.TimeoutException):
+                await get_with_retry("https://api.nasa.gov/test", max_attempts=2)
+        assert len(requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_limiter_is_charged_per_attempt(self):
+        """Test that every attempt, retries included, takes a limiter token."""
+        statuses = [503, 503, 200]
+        limiter = AsyncMock()
+
+        with patch.object(_http, "_CLIENT", mock_client(lambda request: httpx.Response(statuses.pop(0)))), \
+             patch("asyncio.sleep", new_callable=AsyncMock):
+            await get_with_retry("https://api.nasa.gov/test", limiter=limiter)
+        assert limiter.acquire.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_error_stops_retries(self):
+        """Test that a spent limiter raises instead of sending the request."""
+        requests = []
+        limiter = AsyncMock()
+        limiter.acquire.side_effect = RateLimitError(120.0)
+
+        with patch.object(_http, "_CLIENT", mock_client(lambda request: requests.append(request))):
+            with pytest.raises(RateLimitError):
+                await get_with_retry("https://api.nasa.gov/test", limiter=limiter)
+        assert requests == []
+
+
+class TestBBoxPattern:
+    """Test cases for the GIBS bounding box pattern."""
+
+    @pytest.mark.parametrize("bbox", [
+        "-180,-90,180,90",
+        "-125.5,25,-65,50.25",
+        " 0 , 40 , 40 , 70 ",
+    ])
+    def test_accepts_valid_bbox(self, bbox):
+        """Test that four comma-separated numbers match."""
+        assert _BBOX_RE.fullmatch(bbox) is not None
+
+    @pytest.mark.parametrize("bbox", [
+        "-180,-90,180",
+        "-180,-90,180,90,1",
+        "a,b,c,d",
+        "1e3,0,10,10",
+        "-180,-90,180,90;",
+        "",
+    ])
+    def test_rejects_invalid_bbox(self, bbox):
+        """Test that malformed boxes do not match."""
+        assert _BBOX_RE.fullmatch(bbox) is None
+
+    def test_captures_coordinates(self):
+        """Test that the four coordinates are captured in order."""
+        match = _BBOX_RE.fullmatch("-125,25,-65,50")
+        assert tuple(map(float, match.groups())) == (-125.0, 25.0, -65.0, 50.0)